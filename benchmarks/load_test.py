@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.run import LOTTERIES, _git_commit
+from benchmarks.stub_server import StubSite, add_site_arguments, site_from_args, start_server
+from src.lottery_base import LotteryBase
+from src.metrics import metrics
+from src.models.regions import REGIONS
+
+DEFAULT_CONCURRENCY = (1, 4, 16)
+DEFAULT_PAGES = 100
+
+Target = Tuple[str, date]
+
+
+def pick_targets(site: StubSite, regions: Sequence[str], pages: int) -> List[Target]:
+    """The latest `pages` dates of each region the stub can serve, interleaved across regions."""
+    per_region = [
+        sorted((d for r, d in site._records if r == region_code), reverse=True)[:pages]
+        for region_code in regions
+    ]
+    return [(region_code, d) for dates in zip(*per_region) for region_code, d in zip(regions, dates)]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[int(q) - 1]
+
+
+def run_level(base_url: str, targets: List[Target], concurrency: int) -> Dict:
+    """
+    Fetches every target with `concurrency` threads through the real fetchers.
+    Each thread keeps its own lottery instances, as CloudScraper sessions are
+    not shared between threads. A fetch counts as failed when it returns
+    nothing, which is how the fetchers report errors, throttling and '...' pages.
+    """
+    local = threading.local()
+
+    def fetch(target: Target) -> Tuple[str, float]:
+        region_code, selected_date = target
+        instances: Dict[str, LotteryBase] = local.__dict__.setdefault('instances', {})
+        if region_code not in instances:
+            instances[region_code] = LOTTERIES[region_code](base_url=base_url)
+        started = time.perf_counter()
+        try:
+            outcome = 'ok' if instances[region_code].fetch(selected_date) else 'failed'
+        except Exception:
+            outcome = 'exception'
+        return outcome, time.perf_counter() - started
+
+    metrics.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, targets))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for _, seconds in results]
+    outcomes = {name: sum(1 for outcome, _ in results if outcome == name) for name in ('ok', 'failed', 'exception')}
+    statuses: Dict[str, int] = {}
+    incomplete_pages = 0
+    for counter in metrics.snapshot()['counters']:
+        if counter['name'] == 'http_requests':
+            statuses[counter['labels']['status']] = statuses.get(counter['labels']['status'], 0) + int(counter['value'])
+        elif counter['name'] == 'incomplete_pages':
+            incomplete_pages += int(counter['value'])
+
+    return {
+        'concurrency': concurrency,
+        'pages': len(targets),
+        'seconds': elapsed,
+        'pages_per_s': len(targets) / elapsed if elapsed else 0.0,
+        'latency_p50_s': _percentile(latencies, 50),
+        'latency_p90_s': _percentile(latencies, 90),
+        'latency_p99_s': _percentile(latencies, 99),
+        'latency_max_s': max(latencies, default=0.0),
+        **outcomes,
+        'failure_rate': (len(targets) - outcomes['ok']) / len(targets) if targets else 0.0,
+        'http_status': dict(sorted(statuses.items())),
+        'incomplete_pages': incomplete_pages,
+    }
+
+
+def run(site: StubSite, regions: Sequence[str], pages: int, concurrency_levels: Sequence[int]) -> Dict:
+    """Serves `site` on a free local port and sweeps the concurrency levels against it from a temporary working directory."""
+    targets = pick_targets(site, regions, pages)
+    if not targets:
+        raise ValueError("The stub has no pages to serve for the selected regions")
+
+    server = start_server(site)
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    levels = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='lottery-load-') as work_dir:
+        os.chdir(work_dir)
+        try:
+            for concurrency in concurrency_levels:
+                print(f"Fetching {len(targets)} pages with {concurrency} thread(s)", file=sys.stderr)
+                level = run_level(base_url, targets, concurrency)
+                print(f"  {level['pages_per_s']:.1f} pages/s, p90 {level['latency_p90_s'] * 1000:.1f}ms, "
+                      f"{level['ok']} ok, {level['failed']} failed, {level['exception']} exception(s)", file=sys.stderr)
+                levels.append(level)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+
+    return {
+        'commit': _git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'stub': {
+            'latency': site.latency,
+            'jitter': site.jitter,
+            'error_rate': site.error_rate,
+            'throttle_rate': site.throttle_rate,
+            'max_rps': site.max_rps,
+            'partial_rate': site.partial_rate,
+        },
+        'stub_responses': dict(sorted(site.stats.items())),
+        'levels': levels,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the fetchers against the local stub results site')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to fetch (repeatable). Defaults to all regions.')
+    parser.add_argument('--pages', type=int, default=DEFAULT_PAGES, help='Latest dates fetched per region at each concurrency level.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=list(DEFAULT_CONCURRENCY), help='Thread counts to sweep.')
+    parser.add_argument('--output', type=Path, default=Path('benchmark-report-load.json'), help='Where to write the JSON report.')
+    parser.add_argument('--max-failure-rate', type=float, help='Exit with status 1 if any level fails more than this fraction of pages.')
+    add_site_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Resolve before run() changes the working directory
+    args.data_dir = args.data_dir.resolve()
+    report = run(site_from_args(args), args.region or list(REGIONS), args.pages, args.concurrency)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved load test report to {args.output}", file=sys.stderr)
+
+    if args.max_failure_rate is not None:
+        failing = [level for level in report['levels'] if level['failure_rate'] > args.max_failure_rate]
+        for level in failing:
+            print(f"Concurrency {level['concurrency']}: {level['failure_rate']:.1%} of pages failed", file=sys.stderr)
+        if failing:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
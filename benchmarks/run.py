@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pyarrow.parquet as pq
+
+from benchmarks.synthetic import FIXTURES_DIR, generate_records, write_history
+from src import lottery_analyzer, lottery_base
+from src.dataset import KINDS, LotteryDataset
+from src.lottery_base import LotteryBase, parquet_row_group_size
+from src.lotterymb import LotteryMB
+from src.lotterymn import LotteryMN
+from src.lotterymt import LotteryMT
+from src.models.regions import REGIONS
+
+# Not src.fetch.create_lottery: importing src.fetch configures logging to write lottery.log
+LOTTERIES = {
+    'MB': LotteryMB,
+    'MN': LotteryMN,
+    'MT': LotteryMT
+}
+
+DEFAULT_YEARS = (1, 10, 30)
+DEFAULT_REPEAT = 3
+DEFAULT_PAGES = 50
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+class FixtureResponse:
+    def __init__(self, status_code: int, text: str) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+
+
+class FixtureSession:
+    """Stands in for CloudScraper: serves the saved HTML fixtures by file name, 404 otherwise."""
+
+    def get(self, url: str, **kwargs) -> FixtureResponse:
+        path = FIXTURES_DIR / url.rsplit('/', 1)[-1]
+        if not path.exists():
+            return FixtureResponse(404, '')
+        return FixtureResponse(200, path.read_text(encoding='utf-8'))
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Runs `fn` `repeat` times (after `setup`, which is not timed) and returns min/median/max seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {'min_s': min(timings), 'median_s': statistics.median(timings), 'max_s': max(timings)}
+
+
+def bench_parse(repeat: int, pages: int) -> List[Dict]:
+    """Fetches the saved fixture of each region `pages` times through the real parsers."""
+    results = []
+    for region_code, region in REGIONS.items():
+        fixture = next(FIXTURES_DIR.glob(f'{region.prefix}-*.html'))
+        selected_date = datetime.strptime(fixture.stem.split('-', 1)[1], '%d-%m-%Y').date()
+        lottery_instance = LOTTERIES[region_code]()
+        lottery_instance._http = FixtureSession()
+
+        def parse_pages() -> None:
+            for _ in range(pages):
+                if not lottery_instance.fetch(selected_date):
+                    raise RuntimeError(f"Could not parse fixture {fixture}")
+
+        timing = measure(parse_pages, repeat)
+        results.append({'benchmark': 'parse', 'region': region_code, 'years': None, 'rows': pages,
+                        **{key: value / pages for key, value in timing.items()}})
+    return results
+
+
+def _bytes_read() -> Optional[int]:
+    """Bytes this process has read from files so far, page cache hits included (Linux only)."""
+    try:
+        with open('/proc/self/io', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def bench_parquet_reads(region_code: str, records: List[Dict], repeat: int) -> List[Dict]:
+    """
+    Reads a month, a year and the whole history of every Parquet output in ./data
+    through LotteryDataset, recording the bytes actually read next to the timings.
+    The ranges start in the middle of the history.
+    """
+    dates = sorted({record['date'] for record in records})
+    first, last = datetime.fromisoformat(dates[0]).date(), datetime.fromisoformat(dates[-1]).date()
+    middle = first + (last - first) / 2
+    spans = {'month': (middle, middle + timedelta(days=30)), 'year': (middle, middle + timedelta(days=364)), 'all': (None, None)}
+
+    results = []
+    for kind, file_name in KINDS.items():
+        file_path = Path('data') / file_name.format(prefix=REGIONS[region_code].prefix)
+        for span, (start, end) in spans.items():
+            dataset = LotteryDataset(kind).filter(region=region_code, start=start, end=end)
+            timing = measure(dataset.to_table, repeat)
+            before = _bytes_read()
+            rows = dataset.to_table().num_rows
+            after = _bytes_read()
+            results.append({
+                'benchmark': f'dataset.{kind}.{span}', 'region': region_code, 'years': None, 'rows': rows, **timing,
+                'bytes_read': after - before if before is not None and after is not None else None,
+                'file_bytes': file_path.stat().st_size,
+                'row_groups': pq.ParquetFile(file_path).metadata.num_row_groups,
+            })
+    return results
+
+
+def bench_region(region_code: str, years: float, repeat: int) -> List[Dict]:
+    """Benchmarks load, dataframe generation, dump and the analyzer on a synthetic history in ./data."""
+    records = generate_records(region_code, years)
+    write_history(region_code, records, Path('data'))
+    rows = len(records)
+    data_prefix = REGIONS[region_code].prefix
+    results = []
+
+    def add(name: str, timing: Dict[str, float]) -> None:
+        results.append({'benchmark': name, 'region': region_code, 'years': years, 'rows': rows, **timing})
+
+    # load() includes a generate_dataframes() call; both are reported separately too
+    instances: List[LotteryBase] = []
+    add('load', measure(lambda: instances[-1].load(), repeat, setup=lambda: instances.append(LOTTERIES[region_code]())))
+    lottery_instance = instances[-1]
+    add('generate_dataframes', measure(lottery_instance.generate_dataframes, repeat))
+    add('dump', measure(lottery_instance.dump, repeat))
+
+    frames = [lottery_instance.get_raw_data(), lottery_instance.get_2_digits_data(), lottery_instance.get_sparse_data()]
+    json_records = [r for results_in_date in lottery_instance._data.values()
+                    for r in (results_in_date if isinstance(results_in_date, list) else [results_in_date])]
+
+    def dump_json() -> None:
+        with open(Path('data') / f'{data_prefix}.json', 'w', encoding='utf-8') as f:
+            json.dump([item.model_dump(mode='json') for item in json_records], f, indent=2, ensure_ascii=False)
+
+    def dump_csv() -> None:
+        for i, df in enumerate(frames):
+            df.to_csv(Path('data') / f'bench-{i}.csv', index=False)
+
+    def dump_parquet() -> None:
+        for i, df in enumerate(frames):
+            statistics_columns = [col for col in ('date', 'province') if col in df.columns]
+            df.to_parquet(Path('data') / f'bench-{i}.parquet', index=False, row_group_size=parquet_row_group_size(df), write_statistics=statistics_columns)
+
+    add('dump_json', measure(dump_json, repeat))
+    add('dump_csv', measure(dump_csv, repeat))
+    add('dump_parquet', measure(dump_parquet, repeat))
+    add('dump_sparse_json', measure(lottery_instance.generate_and_dump_sparse_json, repeat))
+    for result in bench_parquet_reads(region_code, records, repeat):
+        results.append({**result, 'years': years})
+
+    csv_path = os.path.join('data', lottery_analyzer.two_digits_file(region_code))
+    df = lottery_analyzer.load_region_data(csv_path)
+    now = datetime(2025, 10, 26)
+    add('analyzer.load_region_data', measure(lambda: lottery_analyzer.load_region_data(csv_path), repeat))
+    add('analyzer.get_most_frequent_numbers', measure(lambda: lottery_analyzer.get_most_frequent_numbers(df), repeat))
+    add('analyzer.get_least_recent_numbers', measure(lambda: lottery_analyzer.get_least_recent_numbers(df, now=now), repeat))
+    add('analyzer.analyze_region', measure(lambda: lottery_analyzer.analyze_region(region_code, csv_path), repeat))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_versions() -> Dict[str, Optional[str]]:
+    versions = {}
+    for package in ('numpy', 'pandas', 'pyarrow', 'pydantic', 'beautifulsoup4', 'lxml'):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def run(regions: Sequence[str], years: Sequence[float], repeat: int, pages: int) -> Dict:
+    """Runs every benchmark inside a temporary working directory, so the real data/ is never touched."""
+    results: List[Dict] = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='lottery-bench-') as work_dir:
+        os.chdir(work_dir)
+        try:
+            results.extend(r for r in bench_parse(repeat, pages) if r['region'] in regions)
+            for region_code in regions:
+                for n_years in years:
+                    print(f"Benchmarking {region_code}, {n_years} year(s)", file=sys.stderr)
+                    results.extend(bench_region(region_code, n_years, repeat))
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'commit': _git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'packages': _package_versions(),
+        'repeat': repeat,
+        'parquet_row_group_days': lottery_base.PARQUET_ROW_GROUP_DAYS,
+        'results': results,
+    }
+
+
+def _key(result: Dict) -> tuple:
+    return result['benchmark'], result['region'], result['years']
+
+
+def compare(baseline: Dict, report: Dict, threshold: float) -> List[str]:
+    """
+    Prints the best timings against a baseline report and returns the
+    benchmarks more than `threshold` times slower. The minimum is compared
+    because it is the least affected by other load on the machine.
+    """
+    before = {_key(r): r for r in baseline['results']}
+    regressions = []
+    print(f"{'benchmark':40} {'region':6} {'years':>5} {'baseline':>10} {'current':>10} {'ratio':>6}")
+    for result in report['results']:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+        ratio = result['min_s'] / old['min_s'] if old['min_s'] else float('inf')
+        flag = ' !' if ratio > threshold else ''
+        print(f"{result['benchmark']:40} {result['region']:6} {str(result['years'] or '-'):>5} "
+              f"{old['min_s'] * 1000:>8.2f}ms {result['min_s'] * 1000:>8.2f}ms {ratio:>6.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(f"{result['benchmark']} {result['region']} {result['years']}")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark parsing, loading, dumping and analysis on synthetic histories')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to benchmark (repeatable). Defaults to all regions.')
+    parser.add_argument('--years', type=float, nargs='+', default=list(DEFAULT_YEARS), help='History sizes in years.')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per benchmark; the report keeps min, median and max.')
+    parser.add_argument('--pages', type=int, default=DEFAULT_PAGES, help='Fixture pages parsed per parse run.')
+    parser.add_argument('--output', type=Path, default=Path('benchmark-report.json'), help='Where to write the JSON report.')
+    parser.add_argument('--compare', type=Path, help='Baseline report to compare against.')
+    parser.add_argument('--threshold', type=float, default=1.5, help='With --compare, exit with status 1 if a benchmark is this many times slower.')
+    parser.add_argument('--row-group-days', type=int, help='Draw days per Parquet row group, to compare layouts by bytes read.')
+    args = parser.parse_args(argv)
+
+    if args.row_group_days:
+        lottery_base.PARQUET_ROW_GROUP_DAYS = args.row_group_days
+
+    report = run(args.region or list(REGIONS), args.years, args.repeat, args.pages)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved benchmark report to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than {args.threshold}x the baseline", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
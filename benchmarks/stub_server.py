@@ -0,0 +1,184 @@
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.synthetic import render_page
+from src.models.regions import PREFIX_REGIONS, REGIONS
+from src.ticket_checker import prize_fields
+
+logger = logging.getLogger('vietnam-lottery')
+
+PAGE_PATH = re.compile(rf"^/({'|'.join(PREFIX_REGIONS)})-(\d{{2}})-(\d{{2}})-(\d{{4}})\.html$")
+
+Response = Tuple[int, bytes, Dict[str, str]]
+
+
+class StubSite:
+    """
+    Local stand-in for the results site. Serves xsmb-/xsmn-/xsmt-DD-MM-YYYY.html
+    pages rendered from the JSON data files, with optional latency, 500 errors,
+    429 throttling (random or above a request rate) and partial '...' pages.
+    """
+
+    def __init__(self, data_dir: Path = Path('data'), latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, max_rps: Optional[float] = None,
+                 partial_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.partial_rate = partial_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = max_rps or 0.0
+        self._refilled_at = time.monotonic()
+        self.stats: Dict[str, int] = {}
+
+        self._records: Dict[Tuple[str, date], List[Dict]] = {}
+        self._tiers: Dict[str, List[str]] = {}
+        for region_code, region in REGIONS.items():
+            # Tiers from the special prize down, which is the reverse of the drawing order
+            self._tiers[region_code] = list(dict.fromkeys(tier for _, tier, _ in prize_fields(region.result_model, region.prize_digits)))
+            file_path = data_dir / f'{region.prefix}.json'
+            if not file_path.exists():
+                logger.warning(f"Data file {file_path} does not exist. {region_code} pages will be 404.")
+                continue
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for record in json.load(f):
+                    self._records.setdefault((region_code, date.fromisoformat(record['date'])), []).append(record)
+        logger.info(f"Serving {len(self._records)} pages from {data_dir}")
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    def _over_rate(self) -> bool:
+        """Token bucket refilled at max_rps; an empty bucket means throttling."""
+        if not self.max_rps:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.max_rps, self._tokens + (now - self._refilled_at) * self.max_rps)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def respond(self, path: str) -> Response:
+        if path == '/__stats':
+            with self._lock:
+                return 200, json.dumps(self.stats).encode('utf-8'), {'Content-Type': 'application/json'}
+
+        with self._lock:
+            roll, partial_roll = self._random.random(), self._random.random()
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        match = PAGE_PATH.match(path)
+        if not match:
+            self._count('not_found')
+            return 404, b'Not found', {}
+        if self._over_rate() or roll < self.throttle_rate:
+            self._count('throttled')
+            return 429, b'Too many requests', {'Retry-After': '1'}
+        if roll < self.throttle_rate + self.error_rate:
+            self._count('error')
+            return 500, b'Internal server error', {}
+
+        data_prefix, day, month, year = match.groups()
+        region_code = PREFIX_REGIONS[data_prefix].code
+        selected_date = date(int(year), int(month), int(day))
+        records = self._records.get((region_code, selected_date))
+        if not records:
+            self._count('not_found')
+            return 404, b'Not found', {}
+
+        incomplete_tiers: List[str] = []
+        if partial_roll < self.partial_rate:
+            # Mid-draw: the highest prizes are still '...'
+            tiers = self._tiers[region_code]
+            with self._lock:
+                incomplete_tiers = tiers[:self._random.randint(1, len(tiers) - 1)]
+            self._count('partial')
+        else:
+            self._count('ok')
+        body = render_page(region_code, selected_date, records, incomplete_tiers).encode('utf-8')
+        return 200, body, {'Content-Type': 'text/html; charset=utf-8'}
+
+
+def make_handler(site: StubSite):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            status, body, headers = site.respond(self.path.split('?', 1)[0])
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format % args)
+
+    return StubHandler
+
+
+def start_server(site: StubSite, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Serves `site` from a background thread. Port 0 picks a free port; see server.server_address."""
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='stub-site', daemon=True).start()
+    return server
+
+
+def add_site_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--data-dir', type=Path, default=Path('data'), help='Directory with xsmb.json, xsmn.json and xsmt.json.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency of up to this many seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500.')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429.')
+    parser.add_argument('--max-rps', type=float, help='Answer 429 above this many requests per second.')
+    parser.add_argument('--partial-rate', type=float, default=0.0, help="Fraction of pages served mid-draw, with '...' for the top prizes.")
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs.')
+
+
+def site_from_args(args: argparse.Namespace) -> StubSite:
+    return StubSite(args.data_dir, args.latency, args.jitter, args.error_rate, args.throttle_rate,
+                    args.max_rps, args.partial_rate, args.seed)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Serve results pages rendered from the local JSON data')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to bind.')
+    parser.add_argument('--port', type=int, default=8081, help='Port to listen on.')
+    add_site_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(site_from_args(args)))
+    logger.info(f"Stub results site on http://{args.host}:{args.port} (LOTTERY_BASE_URL=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import html
+import json
+from datetime import date, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.models.regions import REGIONS
+from src.ticket_checker import prize_fields
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Weekly province rotation (Monday = 0) in the order the results site lists
+# them, as observed in data/xsmn.json and data/xsmt.json
+SCHEDULES: Dict[str, Dict[int, List[str]]] = {
+    'MN': {
+        0: ['TPHCM', 'Đồng Tháp', 'Cà Mau'],
+        1: ['Bến Tre', 'Vũng Tàu', 'Bạc Liêu'],
+        2: ['Đồng Nai', 'Cần Thơ', 'Sóc Trăng'],
+        3: ['Tây Ninh', 'An Giang', 'Bình Thuận'],
+        4: ['Vĩnh Long', 'Bình Dương', 'Trà Vinh'],
+        5: ['TPHCM', 'Long An', 'Bình Phước', 'Hậu Giang'],
+        6: ['Tiền Giang', 'Kiên Giang', 'Đà Lạt'],
+    },
+    'MT': {
+        0: ['Huế', 'Phú Yên'],
+        1: ['Đắk Lắk', 'Quảng Nam'],
+        2: ['Đà Nẵng', 'Khánh Hòa'],
+        3: ['Bình Định', 'Quảng Trị', 'Quảng Bình'],
+        4: ['Gia Lai', 'Ninh Thuận'],
+        5: ['Đà Nẵng', 'Quảng Ngãi', 'Đắk Nông'],
+        6: ['Huế', 'Kon Tum', 'Khánh Hòa'],
+    },
+}
+
+# Row labels of the result table, keyed by prize tier
+TIER_LABELS = {'special': 'ĐB', **{f'prize{i}': str(i) for i in range(1, 9)}}
+
+
+def provinces_for(region_code: str, selected_date: date) -> List[Optional[str]]:
+    """Provinces drawing on a date; MB has a single draw without a province."""
+    if region_code == 'MB':
+        return [None]
+    return SCHEDULES[region_code][selected_date.weekday()]
+
+
+def generate_records(region_code: str, years: float, end_date: date = date(2025, 10, 25), seed: int = 0) -> List[Dict]:
+    """
+    Synthetic history of `years` years up to `end_date`, as the JSON records
+    dump() writes: one per date for MB, one per province and date for MN/MT.
+    Numbers are uniform within each tier's width.
+    """
+    region = REGIONS[region_code]
+    fields = prize_fields(region.result_model, region.prize_digits)
+    rng = np.random.default_rng(seed)
+
+    days = int(round(years * 365.25))
+    dates = [end_date - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    slots = [(day, province) for day in dates for province in provinces_for(region_code, day)]
+
+    # One column per prize field, drawn in one go
+    columns = {field: rng.integers(0, 10 ** digits, size=len(slots)).tolist() for field, _, digits in fields}
+
+    records = []
+    for i, (day, province) in enumerate(slots):
+        record: Dict = {'date': day.isoformat()}
+        if province is not None:
+            record['province'] = province
+        for field, _, _ in fields:
+            record[field] = columns[field][i]
+        records.append(record)
+    return records
+
+
+def write_history(region_code: str, records: List[Dict], data_dir: Path) -> Path:
+    """Writes records where LotteryBase.load() looks for them."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    file_path = data_dir / f'{REGIONS[region_code].prefix}.json'
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+    return file_path
+
+
+def _tier_cells(region_code: str, record: Dict, incomplete_tiers: Sequence[str]) -> Dict[str, List[str]]:
+    region = REGIONS[region_code]
+    cells = {}
+    for tier, group in groupby(prize_fields(region.result_model, region.prize_digits), key=lambda f: f[1]):
+        cells[tier] = ['...' if tier in incomplete_tiers else str(record[field]).zfill(digits) for field, _, digits in group]
+    return cells
+
+
+def render_page(region_code: str, selected_date: date, records: List[Dict], incomplete_tiers: Sequence[str] = ()) -> str:
+    """
+    Renders the results of one date as the `table.table-result` markup the
+    fetchers parse. Tiers in `incomplete_tiers` show '...' like a page loaded
+    while the draw is still running.
+    """
+    title = f"{REGIONS[region_code].name} {selected_date:%d/%m/%Y}"
+    rows = []
+    if region_code == 'MB':
+        # One row per tier, numbers of a tier in separate spans (MB is read from the text of the row)
+        cells = _tier_cells(region_code, records[0], incomplete_tiers)
+        for tier, numbers in cells.items():
+            spans = ''.join(f'<span>{n}</span>' for n in numbers)
+            rows.append(f'<tr><th>{TIER_LABELS[tier]}</th><td>{spans}</td></tr>')
+    else:
+        # A column per province, lowest prize first as on the site
+        header = ''.join(f'<th>{html.escape(r["province"])}</th>' for r in records)
+        rows.append(f'<tr><th>Giải</th>{header}</tr>')
+        per_province = [_tier_cells(region_code, r, incomplete_tiers) for r in records]
+        for tier in reversed(list(per_province[0])):
+            cells = ''.join('<td>' + ' '.join(f'<span>{n}</span>' for n in c[tier]) + '</td>' for c in per_province)
+            rows.append(f'<tr><th>{TIER_LABELS[tier]}</th>{cells}</tr>')
+
+    body = '\n'.join(rows)
+    return (
+        f'<!DOCTYPE html>\n<html lang="vi"><head><meta charset="utf-8"><title>{title}</title></head>\n'
+        f'<body><h2>{title}</h2>\n<table class="table-result">\n{body}\n</table></body></html>\n'
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Generate synthetic lottery histories')
+    parser.add_argument('--years', type=float, default=1, help='Years of history to generate.')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to generate (repeatable). Defaults to all regions.')
+    parser.add_argument('--data-dir', type=Path, required=True, help='Directory to write the JSON histories to (never the real data/).')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args(argv)
+
+    for region_code in args.region or list(REGIONS):
+        records = generate_records(region_code, args.years, seed=args.seed)
+        print(f"{write_history(region_code, records, args.data_dir)}: {len(records)} records")
+
+
+if __name__ == '__main__':
+    main()
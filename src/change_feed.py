@@ -0,0 +1,175 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .data_files import iter_lines_reversed
+
+logger = logging.getLogger('vietnam-lottery')
+
+# Kept to the standard library so consumers can tail the feed without pandas.
+DEFAULT_POLL_INTERVAL = 5.0
+
+Change = Dict
+RecordKey = Tuple[str, str]
+
+
+def feed_path() -> Path:
+    return Path('data') / 'changes.ndjson'
+
+
+def record_key(record: Dict) -> RecordKey:
+    return str(record['date']), record.get('province', '')
+
+
+def diff_records(previous: Iterable[Dict], current: Iterable[Dict]) -> List[Tuple[str, Dict]]:
+    """
+    Compares model dumps of the same dates before and after a fetch and
+    returns ('insert' | 'update', record) for every draw that is new or differs.
+    """
+    before = {record_key(record): record for record in previous}
+    changes = []
+    for record in current:
+        old = before.get(record_key(record))
+        if old is None:
+            changes.append(('insert', record))
+        elif old != record:
+            changes.append(('update', record))
+    return changes
+
+
+def last_sequence(file_path: Optional[Path] = None) -> int:
+    """Sequence number of the last change in the feed (0 if empty), read from the tail of the file."""
+    file_path = file_path or feed_path()
+    try:
+        for line in iter_lines_reversed(file_path):
+            try:
+                return int(json.loads(line)['seq'])
+            except ValueError:
+                logger.warning(f"Ignoring unreadable line at the end of {file_path}")
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def _ends_with_newline(file_path: Path) -> bool:
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def append_changes(region_code: str, changes: Sequence[Tuple[str, Dict]], file_path: Optional[Path] = None) -> int:
+    """
+    Appends changes with consecutive sequence numbers and returns the last one.
+    The feed is only ever appended to, so a consumer's byte offset stays valid
+    forever. There must be a single writer (the fetch process).
+    """
+    file_path = file_path or feed_path()
+    seq = last_sequence(file_path)
+    if not changes:
+        return seq
+
+    recorded_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    lines = []
+    for op, record in changes:
+        seq += 1
+        change = {'seq': seq, 'op': op, 'region': region_code, 'date': str(record['date'])}
+        if 'province' in record:
+            change['province'] = record['province']
+        change['record'] = record
+        change['recorded_at'] = recorded_at
+        lines.append(json.dumps(change, ensure_ascii=False) + '\n')
+
+    # One write of whole lines, so a reader never sees a change without its newline for long.
+    # A line torn by a crash is terminated first, so it cannot swallow the next change.
+    torn = file_path.exists() and not _ends_with_newline(file_path)
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(('\n' if torn else '') + ''.join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+    logger.info(f"Appended {len(lines)} {region_code} change(s) to {file_path}, last seq {seq}")
+    return seq
+
+
+def _iter_from(file_path: Path, offset: int) -> Iterator[Tuple[Change, int]]:
+    """Yields (change, offset after it) for every complete line from `offset` on."""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if offset > f.tell():
+            raise ValueError(f"Offset {offset} is past the end of {file_path} ({f.tell()} bytes)")
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break # Still being written; picked up on the next read
+            offset += len(line)
+            try:
+                change = json.loads(line) if line.strip() else None
+            except ValueError:
+                logger.warning(f"Skipping unreadable line before offset {offset} in {file_path}")
+                continue
+            if change is not None:
+                yield change, offset
+
+
+def read_changes(offset: int = 0, file_path: Optional[Path] = None) -> Tuple[List[Change], int]:
+    """
+    Returns the changes written after byte `offset` and the offset to resume
+    from next time. Each call only reads what was appended since the last one.
+    """
+    file_path = file_path or feed_path()
+    changes: List[Change] = []
+    try:
+        for change, offset in _iter_from(file_path, offset):
+            changes.append(change)
+    except FileNotFoundError:
+        pass
+    return changes, offset
+
+
+def follow(offset: int = 0, interval: float = DEFAULT_POLL_INTERVAL, file_path: Optional[Path] = None) -> Iterator[Tuple[Change, int]]:
+    """Tails the feed forever, yielding (change, offset to resume after it)."""
+    file_path = file_path or feed_path()
+    while True:
+        try:
+            for change, offset in _iter_from(file_path, offset):
+                yield change, offset
+        except FileNotFoundError:
+            pass
+        time.sleep(interval)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Print lottery result changes appended after a byte offset')
+    parser.add_argument('--offset', type=int, default=0, help='Byte offset to start from (the next_offset of the previous run).')
+    parser.add_argument('--follow', action='store_true', help='Keep waiting for new changes.')
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL, help='Seconds between polls with --follow.')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.follow:
+            for change, offset in follow(args.offset, args.interval):
+                print(json.dumps({**change, 'next_offset': offset}, ensure_ascii=False), flush=True)
+            return 0
+
+        changes, offset = read_changes(args.offset)
+        for change in changes:
+            print(json.dumps(change, ensure_ascii=False))
+        print(f"next_offset={offset}", file=sys.stderr)
+        return 0
+    except KeyboardInterrupt:
+        return 0
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
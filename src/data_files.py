@@ -0,0 +1,96 @@
+import csv
+import io
+import os
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+READ_BLOCK_SIZE = 8192
+
+
+@contextmanager
+def atomic_write(file_path: Path) -> Iterator[Path]:
+    """
+    Yields a temporary path next to `file_path` to write to, then syncs it and
+    renames it over `file_path`, so readers see either the old or the new file.
+    The temporary file is removed if writing fails.
+    """
+    tmp_path = file_path.with_name(file_path.name + '.tmp')
+    try:
+        yield tmp_path
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def iter_lines_reversed(file_path: Path) -> Iterator[str]:
+    """Yields the lines of a text file from last to first, reading blocks from the end."""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            size = min(READ_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8').rstrip('\r')
+        if remainder.strip():
+            yield remainder.decode('utf-8').rstrip('\r')
+
+
+def read_header(file_path: Path) -> List[str]:
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def parse_row(line: str) -> List[str]:
+    return next(csv.reader(io.StringIO(line)))
+
+
+def latest_csv_date(file_path: Path) -> Optional[date]:
+    """
+    Date of the last row of a data CSV. dump() writes rows sorted by date,
+    so this only reads the tail of the file.
+    """
+    for line in iter_lines_reversed(file_path):
+        value = parse_row(line)[0]
+        if value == 'date':
+            return None # Header only
+        return date.fromisoformat(value[:10])
+    return None
+
+
+def latest_csv_rows(file_path: Path) -> List[List[str]]:
+    """All rows of the last date in a data CSV, in file order."""
+    rows: List[List[str]] = []
+    last_date = None
+    for line in iter_lines_reversed(file_path):
+        row = parse_row(line)
+        if row[0] == 'date' or (last_date is not None and row[0] != last_date):
+            break
+        last_date = row[0]
+        rows.append(row)
+    return rows[::-1]
+
+
+def csv_rows_for_date(file_path: Path, selected_date: date) -> List[List[str]]:
+    """All rows of a given date, stopping at the first later date since rows are sorted."""
+    wanted = selected_date.isoformat()
+    rows: List[List[str]] = []
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            day = row[0][:10]
+            if day == wanted:
+                rows.append(row)
+            elif day > wanted:
+                break
+    return rows
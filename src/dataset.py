@@ -0,0 +1,230 @@
+import argparse
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+
+from .models.regions import REGIONS
+
+logger = logging.getLogger('vietnam-lottery')
+
+# Parquet outputs written by LotteryBase.dump(), keyed by dataset kind
+KINDS = {
+    'raw': '{prefix}.parquet',
+    '2-digits': '{prefix}-2-digits.parquet',
+    'sparse': '{prefix}-sparse.parquet',
+}
+
+KEY_COLUMNS = ['region', 'date', 'province']
+
+DateLike = Union[date, datetime, str]
+
+
+def _open(file_path: Path) -> ds.Dataset:
+    """
+    Opens one Parquet file through a fragment whose footer is read once, for the
+    schema, and kept for the scan. ds.dataset() would read it again when scanning.
+    """
+    parquet_format = ds.ParquetFileFormat()
+    fragment = parquet_format.make_fragment(str(file_path.resolve()), filesystem=fs.LocalFileSystem())
+    return ds.FileSystemDataset([fragment], fragment.physical_schema, parquet_format)
+
+
+def _to_date(value: Optional[DateLike]) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value.date() if isinstance(value, datetime) else value
+    return date.fromisoformat(value)
+
+
+class LotteryDataset:
+    """
+    Lazy view over the Parquet outputs of all three regions. filter() and
+    select() only record what is wanted; nothing is read until to_table(),
+    to_pandas() or to_batches(). Date and province filters are pushed down to
+    the Parquet reader, which skips row groups whose statistics rule them out,
+    and only the selected columns are decoded.
+
+        LotteryDataset().filter(region='MN', start='2024-03-01', end='2024-03-31').select('special').to_pandas()
+    """
+
+    def __init__(self, kind: str = 'raw', data_dir: Union[str, Path] = 'data') -> None:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown dataset kind {kind!r}, expected one of {list(KINDS)}")
+        self._kind = kind
+        self._data_dir = Path(data_dir)
+        self._regions: List[str] = list(REGIONS)
+        self._start: Optional[date] = None
+        self._end: Optional[date] = None
+        self._provinces: Optional[List[str]] = None
+        self._columns: Optional[List[str]] = None
+
+    def _copy(self) -> 'LotteryDataset':
+        other = LotteryDataset.__new__(LotteryDataset)
+        other.__dict__.update(self.__dict__)
+        return other
+
+    def filter(self, region: Union[str, Sequence[str], None] = None, start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None, province: Union[str, Sequence[str], None] = None) -> 'LotteryDataset':
+        """Returns a new dataset narrowed to the given regions, inclusive date range and provinces."""
+        other = self._copy()
+        if region is not None:
+            regions = [region] if isinstance(region, str) else list(region)
+            unknown = [r for r in regions if r.upper() not in REGIONS]
+            if unknown:
+                raise ValueError(f"Unknown region(s): {unknown}")
+            other._regions = [r for r in self._regions if r in {r.upper() for r in regions}]
+        if start is not None:
+            start = _to_date(start)
+            other._start = start if self._start is None else max(self._start, start)
+        if end is not None:
+            end = _to_date(end)
+            other._end = end if self._end is None else min(self._end, end)
+        if province is not None:
+            provinces = [province] if isinstance(province, str) else list(province)
+            other._provinces = provinces if self._provinces is None else [p for p in self._provinces if p in provinces]
+        return other
+
+    def select(self, *columns: str) -> 'LotteryDataset':
+        """Returns a new dataset that only reads the given columns (region, date and province are always kept)."""
+        other = self._copy()
+        other._columns = [c for c in columns if c not in KEY_COLUMNS]
+        return other
+
+    def _file_path(self, region_code: str) -> Path:
+        return self._data_dir / KINDS[self._kind].format(prefix=REGIONS[region_code].prefix)
+
+    def _expression(self, schema: pa.Schema) -> Optional[ds.Expression]:
+        conditions = []
+        if self._start is not None or self._end is not None:
+            # Compare against scalars of the file's own timestamp type so the
+            # expression matches the row group statistics without casting the column
+            date_type = schema.field('date').type
+            if self._start is not None:
+                conditions.append(ds.field('date') >= pa.scalar(datetime.combine(self._start, datetime.min.time()), type=date_type))
+            if self._end is not None:
+                conditions.append(ds.field('date') < pa.scalar(datetime.combine(self._end, datetime.min.time()) + pd.Timedelta(days=1), type=date_type))
+        if self._provinces is not None:
+            conditions.append(ds.field('province').isin(self._provinces))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _datasets(self) -> Dict[str, ds.Dataset]:
+        """Opens the file of every selected region once, for both the output schema and the scan."""
+        datasets = {}
+        for region_code in self._regions:
+            file_path = self._file_path(region_code)
+            if not file_path.exists():
+                logger.warning(f"Data file {file_path} does not exist. Skipping {region_code}.")
+                continue
+            datasets[region_code] = _open(file_path)
+        return datasets
+
+    def _scanners(self, datasets: Dict[str, ds.Dataset]) -> Iterator[Tuple[str, ds.Scanner]]:
+        if self._start is not None and self._end is not None and self._start > self._end:
+            return
+        for region_code, dataset in datasets.items():
+            schema = dataset.schema
+            if self._provinces is not None and 'province' not in schema.names:
+                continue # MB has a single draw and no provinces
+
+            if self._columns is None:
+                columns = [c for c in schema.names if c not in KEY_COLUMNS]
+            else:
+                missing = [c for c in self._columns if c not in schema.names]
+                if missing and len(self._regions) == 1:
+                    raise ValueError(f"Unknown column(s) for {region_code}: {missing}")
+                columns = [c for c in self._columns if c in schema.names]
+            columns = [c for c in ('date', 'province') if c in schema.names] + columns
+
+            yield region_code, dataset.scanner(columns=columns, filter=self._expression(schema))
+
+    def _output_schema(self, datasets: Dict[str, ds.Dataset]) -> pa.Schema:
+        """
+        One schema for every region: region, date and province first, then the
+        other columns in the order of the first file having them. Province is
+        plain string everywhere; files written by different pandas versions differ.
+        """
+        fields: Dict[str, pa.Field] = {}
+        date_type, has_province = pa.timestamp('ns'), False
+        for dataset in datasets.values():
+            schema = dataset.schema
+            date_type = schema.field('date').type
+            has_province = has_province or 'province' in schema.names
+            for field in schema:
+                if field.name not in KEY_COLUMNS and field.name not in fields and (self._columns is None or field.name in self._columns):
+                    fields[field.name] = field
+
+        names = list(fields)
+        if self._columns is not None:
+            names.sort(key=self._columns.index)
+        keys = [pa.field('region', pa.string()), pa.field('date', date_type)]
+        if has_province:
+            keys.append(pa.field('province', pa.string()))
+        return pa.schema(keys + [fields[name] for name in names])
+
+    def _unify(self, region_code: str, table: pa.Table, schema: pa.Schema) -> pa.Table:
+        """Adds the region column and null-fills columns the region does not have (MB has no province or prize8)."""
+        arrays = []
+        for field in schema:
+            if field.name == 'region':
+                arrays.append(pa.array([region_code] * len(table), type=pa.string()))
+            elif field.name in table.column_names:
+                arrays.append(table.column(field.name).cast(field.type))
+            else:
+                arrays.append(pa.nulls(len(table), type=field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def to_batches(self) -> Iterator[pa.Table]:
+        """Yields the matching rows region by region, one small table per Parquet batch."""
+        datasets = self._datasets()
+        schema = self._output_schema(datasets)
+        for region_code, scanner in self._scanners(datasets):
+            for batch in scanner.to_batches():
+                if batch.num_rows:
+                    yield self._unify(region_code, pa.Table.from_batches([batch]), schema)
+
+    def to_table(self) -> pa.Table:
+        datasets = self._datasets()
+        schema = self._output_schema(datasets)
+        tables = [self._unify(region_code, scanner.to_table(), schema) for region_code, scanner in self._scanners(datasets)]
+        return pa.concat_tables(tables) if tables else schema.empty_table()
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Matching rows ordered by region (MB, MN, MT) and then by date."""
+        return self.to_table().to_pandas()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Read lottery results from the Parquet outputs of all regions')
+    parser.add_argument('--kind', type=str, default='raw', choices=list(KINDS), help='Which output to read.')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to read (repeatable). Defaults to all regions.')
+    parser.add_argument('--start', type=str, help='First date in format YYYY-MM-DD.')
+    parser.add_argument('--end', type=str, help='Last date in format YYYY-MM-DD.')
+    parser.add_argument('--province', type=str, action='append', help='Province to read (repeatable).')
+    parser.add_argument('--columns', type=str, help='Comma-separated columns to read, e.g. special,prize1.')
+    parser.add_argument('--output', type=str, help='Write the result to this CSV file instead of printing it.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    dataset = LotteryDataset(args.kind).filter(region=args.region, start=args.start, end=args.end, province=args.province)
+    if args.columns:
+        dataset = dataset.select(*args.columns.split(','))
+    df = dataset.to_pandas()
+    if args.output:
+        df.to_csv(args.output, index=False)
+        logger.info(f"Saved {len(df)} rows to {args.output}")
+    else:
+        print(df.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,59 +1,166 @@
 import argparse
 import logging
+import signal
+import threading
 from datetime import date, datetime, time, timedelta
+from pathlib import Path
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import json
 
-from .lotterymb import LotteryMB
-from .lotterymn import LotteryMN
-from .lotterymt import LotteryMT
-from .lottery_base import LotteryBase # Import LotteryBase for type hinting
+from .data_files import latest_csv_date
+from .manifest import manifest_last_date
+from .metrics import DEFAULT_METRICS_DIR, metrics
+from .models.regions import REGIONS
+
+# The lottery classes pull in pandas, BeautifulSoup, cloudscraper and pydantic,
+# so they are only imported once there is actually something to fetch.
+if TYPE_CHECKING:
+    from .lottery_base import LotteryBase
+    from .lottery_stats import GapStatsCache
+    from .suffix_index import SuffixIndex
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('lottery.log', mode='w'),
+        logging.FileHandler('lottery.log'),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger('vietnam-lottery')
 
 
-def _fetch_lottery_data(lottery_instance: LotteryBase, lottery_type: str, start_date: date, end_date: date) -> bool:
+VIETNAM_TZ = ZoneInfo('Asia/Ho_Chi_Minh')
+
+# Vietnam time by which each region's results are usually final (draws end about 16:35, 17:35 and 18:35)
+RESULTS_READY = {
+    'MN': time(16, 40),
+    'MT': time(17, 40),
+    'MB': time(18, 40)
+}
+DAEMON_RETRY_INTERVAL = timedelta(minutes=2)
+DAEMON_MAX_RETRY_INTERVAL = timedelta(minutes=30)
+
+# The site sometimes corrects a draw after publishing it: the latest stored days are fetched again to pick that up.
+# On by default in daemon mode only; one-shot runs opt in with --refetch-days (as the scheduled workflow does).
+DEFAULT_REFETCH_DAYS = 3
+
+
+def create_lottery(region_code: str, base_url: Optional[str] = None) -> 'LotteryBase':
+    if region_code == 'MB':
+        from .lotterymb import LotteryMB
+        return LotteryMB(base_url)
+    if region_code == 'MN':
+        from .lotterymn import LotteryMN
+        return LotteryMN(base_url)
+    if region_code == 'MT':
+        from .lotterymt import LotteryMT
+        return LotteryMT(base_url)
+    raise ValueError(f"Unknown region: {region_code}")
+
+
+def _fetch_lottery_data(lottery_instance: 'LotteryBase', region_code: str, start_date: date, end_date: date,
+                        refetch_days: int = 0) -> bool:
+    lottery_instance.load()
+    return _fetch_and_store(lottery_instance, region_code, start_date, end_date, refetch_days)
+
+
+def _stored_records(lottery_instance: 'LotteryBase', selected_date: date) -> List:
+    stored = lottery_instance._data.get(selected_date) or []
+    return list(stored) if isinstance(stored, list) else [stored]
+
+
+@metrics.timed('fetch')
+def _fetch_and_store(lottery_instance: 'LotteryBase', region_code: str, start_date: date, end_date: date,
+                     refetch_days: int = 0, gap_stats: Optional['GapStatsCache'] = None,
+                     suffix_index: Optional['SuffixIndex'] = None) -> bool:
+    """
+    Fetches the missing dates of a range into an already loaded instance and writes
+    everything derived from them. Stored dates within `refetch_days` of the latest
+    stored date are fetched again, and differences from the stored draw are
+    written as corrections. Nothing is written when no draw changed. A stored
+    date that cannot be fetched again makes the run fail, even though the
+    stored draw is kept.
+    `gap_stats` and `suffix_index` are kept by callers that fetch repeatedly,
+    so they are only read from disk once.
+    """
+    from .change_feed import append_changes, diff_records
+    from .lottery_stats import GapStatsCache
+    from .suffix_index import update_suffix_index
+
+    lottery_type = REGIONS[region_code].name
+
     logger.info(f"Fetching {lottery_type} from {start_date} to {end_date}")
     try:
-        lottery_instance.load()
-        
         delta = (end_date - start_date).days + 1
         success_count = 0
+        refetch_failures = 0
+        fetched_records = []
+        previous_records = [] # What was stored for the fetched dates before, to tell inserts from corrections
+        last_stored = lottery_instance.get_last_date() if lottery_instance._data else None
+        refetch_since = last_stored - timedelta(days=refetch_days - 1) if last_stored and refetch_days > 0 else None
         
         for i in range(delta):
             selected_date = start_date + timedelta(days=i)
             
-            if selected_date in lottery_instance._data:
+            if selected_date in lottery_instance._data and (refetch_since is None or selected_date < refetch_since):
                 logger.info(f"Data for {lottery_type} on {selected_date} already exists. Skipping fetch.")
                 success_count += 1 # Count as successful since data is already there
                 continue
 
             try:
                 logger.info(f'Fetching {lottery_type}: {selected_date}')
+                # Captured before fetch() replaces the stored draw
+                previous = _stored_records(lottery_instance, selected_date)
                 result = lottery_instance.fetch(selected_date)
                 if result: # Check if result is not None and not an empty list
                     success_count += 1
+                    results = result if isinstance(result, list) else [result]
+                    missing = {getattr(r, 'province', '') for r in previous} - {getattr(r, 'province', '') for r in results}
+                    if missing:
+                        # A province that failed to parse this time must not drop the stored one
+                        logger.warning(f"Keeping stored {lottery_type} results for {selected_date}: {', '.join(sorted(missing))} missing from the page")
+                        lottery_instance._store_result(selected_date, previous)
+                        refetch_failures += 1
+                        continue
+                    previous_records.extend(r.model_dump(mode='json') for r in previous)
+                    fetched_records.extend(r.model_dump(mode='json') for r in results)
+                elif previous:
+                    logger.error(f"Could not fetch {lottery_type} for {selected_date} again. Keeping the stored results.")
+                    refetch_failures += 1
                 else:
                     logger.warning(f"No data or invalid data for {lottery_type} on {selected_date}")
             except Exception as e:
                 logger.error(f"Error fetching {lottery_type} for {selected_date}: {str(e)}")
+                if _stored_records(lottery_instance, selected_date):
+                    refetch_failures += 1
+
+        if refetch_failures:
+            logger.error(f"{refetch_failures} stored {lottery_type} days could not be checked for corrections")
+
+        changes = diff_records(previous_records, fetched_records)
+        if success_count > 0 and not changes:
+            logger.info(f"{lottery_type} has no new or corrected results from {start_date} to {end_date}")
+            return not refetch_failures
 
         if success_count > 0:
+            # Only new draws after the latest stored one: the CSV files just need them appended
+            appended = last_stored and all(op == 'insert' and record['date'] > last_stored.isoformat() for op, record in changes)
             lottery_instance.generate_dataframes()
-            lottery_instance.dump()
+            lottery_instance.dump(last_stored if appended else None)
             lottery_instance.generate_and_dump_sparse_json()
+            with metrics.timer('gap_stats', region=lottery_instance._data_prefix):
+                (gap_stats or GapStatsCache(lottery_instance._data_prefix)).update(lottery_instance.get_sparse_data())
+            with metrics.timer('suffix_index', region=lottery_instance._data_prefix):
+                update_suffix_index(region_code, fetched_records, suffix_index)
+            lottery_instance.write_manifest()
+            # Only after the data files are written, so every change in the feed is already stored
+            append_changes(region_code, changes)
+            metrics.incr('rows_processed', len(fetched_records), region=lottery_instance._data_prefix, stage='fetch')
             logger.info(f"Successfully fetched {success_count}/{delta} days of {lottery_type} data")
-            return True
+            return not refetch_failures
         else:
             logger.error(f"No valid {lottery_type} data fetched")
             return False
@@ -70,69 +177,184 @@ def parse_date(date_str: str) -> date:
     except ValueError as e:
         raise argparse.ArgumentTypeError(f"Invalid date format: {e}. Use YYYY-MM-DD")
 
-def get_date_range(args: argparse.Namespace) -> tuple[date, date]:
-    """Get start and end dates based on input or current time"""
+def get_date_range(args: argparse.Namespace, region_code: str = 'MB') -> tuple[date, date]:
+    """
+    Get start and end dates based on input or current time.
+    Without --start, fetching resumes the day after the region's latest stored
+    date, or --refetch-days before it so the latest stored days are checked for
+    corrections along with the new ones. When the region is already up to date
+    the start is after the end date, so the run stays a no-op.
+    """
     start_date, end_date = args.start, args.end
 
     if end_date is None:
-        tz = ZoneInfo('Asia/Ho_Chi_Minh')
-        now = datetime.now(tz)
+        now = datetime.now(VIETNAM_TZ)
         end_date = now.date()
         logger.info(f"Current time in Vietnam: {now.time()}")
 
     if start_date is None:
-        data_file = 'data/xsmb.csv' # default
-        if args.region:
-            # The region argument is a list, so we take the first element.
-            region_code = args.region.lower()
-            data_file = f'data/xs{region_code}.csv'
-
-        try:
-            import pandas as pd
-            df = pd.read_csv(data_file)
-            latest_date_str = df['date'].max()
-            latest_date = datetime.strptime(latest_date_str, '%Y-%m-%d').date()
-            
-            if latest_date < end_date:
-                start_date = latest_date + timedelta(days=1)
-            else:
-                start_date = end_date
+        data_prefix = REGIONS[region_code].prefix
+        data_file = Path('data') / f'{data_prefix}.csv'
+
+        # The manifest written by dump() answers this without touching the data;
+        # the CSV tail covers data written before manifests existed.
+        latest_date = manifest_last_date(data_prefix)
+        if latest_date is None:
+            try:
+                latest_date = latest_csv_date(data_file)
+            except (FileNotFoundError, ValueError, IndexError):
+                latest_date = None
 
-        except (FileNotFoundError, pd.errors.EmptyDataError, KeyError):
+        if latest_date is not None and latest_date >= end_date:
+            start_date = latest_date + timedelta(days=1) # Up to date: nothing new to check corrections along with
+        elif latest_date is not None:
+            start_date = latest_date + timedelta(days=1 - args.refetch_days)
+        else:
             logger.warning(f"Could not determine latest date from {data_file}. Defaulting to 7 days ago.")
             start_date = end_date - timedelta(days=7)
 
-    logger.info(f"Date range: {start_date} to {end_date}")
+    logger.info(f"{region_code} date range: {start_date} to {end_date}")
     return start_date, end_date
 
 
+class FetchDaemon:
+    """
+    Long-running replacement for the scheduled one-shot fetches. Each region's
+    lottery instance, gap stats cache and suffix index are created and loaded
+    once, so sessions, history and derived state stay warm between draws.
+    After a region's results are usually final (RESULTS_READY, Vietnam time)
+    its missing dates are fetched and dumped; incomplete days are retried
+    with a growing interval until they are stored.
+    """
+
+    def __init__(self, regions: List[str], retry_interval: timedelta = DAEMON_RETRY_INTERVAL, metrics_dir: Optional[Path] = None,
+                 base_url: Optional[str] = None, refetch_days: int = DEFAULT_REFETCH_DAYS) -> None:
+        self._regions = regions
+        self._base_url = base_url
+        self._refetch_days = refetch_days
+        self._retry_interval = retry_interval
+        self._metrics_dir = metrics_dir
+        self._lotteries: Dict[str, 'LotteryBase'] = {}
+        self._gap_stats: Dict[str, 'GapStatsCache'] = {}
+        self._suffix_indexes: Dict[str, 'SuffixIndex'] = {}
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, datetime] = {}
+        self._stop = threading.Event()
+
+    def stop(self, *_) -> None:
+        """Asks the daemon to exit once the current fetch is written. Usable as a signal handler."""
+        logger.info("Stopping fetch daemon")
+        self._stop.set()
+
+    def _lottery(self, region_code: str) -> 'LotteryBase':
+        if region_code not in self._lotteries:
+            from .lottery_stats import GapStatsCache
+            from .suffix_index import SuffixIndex
+            lottery_instance = create_lottery(region_code, self._base_url)
+            lottery_instance.load()
+            self._lotteries[region_code] = lottery_instance
+            self._gap_stats[region_code] = GapStatsCache(lottery_instance._data_prefix)
+            self._suffix_indexes[region_code] = SuffixIndex(region_code)
+        return self._lotteries[region_code]
+
+    def pending_range(self, region_code: str, now: datetime) -> Optional[tuple[date, date]]:
+        """Dates the region is missing as of `now`, or None when it is complete."""
+        end_date = now.date() if now.time() >= RESULTS_READY[region_code] else now.date() - timedelta(days=1)
+        lottery_instance = self._lottery(region_code)
+        if lottery_instance._data:
+            start_date = lottery_instance.get_last_date() + timedelta(days=1)
+        else:
+            start_date = end_date - timedelta(days=7)
+        return (start_date, end_date) if start_date <= end_date else None
+
+    def _next_ready(self, region_code: str, now: datetime) -> datetime:
+        ready = datetime.combine(now.date(), RESULTS_READY[region_code], tzinfo=VIETNAM_TZ)
+        return ready if ready > now else ready + timedelta(days=1)
+
+    def run_once(self, now: datetime) -> datetime:
+        """Fetches every region that is due and returns when to wake up next."""
+        for region_code in self._regions:
+            if self._stop.is_set():
+                break
+            if self._retry_at.get(region_code, now) > now:
+                continue
+            pending = self.pending_range(region_code, now)
+            if pending is None:
+                continue
+
+            # Along with the missing dates, the latest stored ones are checked for corrections
+            start_date, end_date = pending
+            _fetch_and_store(self._lottery(region_code), region_code, start_date - timedelta(days=self._refetch_days), end_date,
+                             self._refetch_days, self._gap_stats[region_code], self._suffix_indexes[region_code])
+            if self.pending_range(region_code, now) is None:
+                self._failures.pop(region_code, None)
+                self._retry_at.pop(region_code, None)
+            else:
+                # Results are not final yet, or there was no draw (e.g. Tết): back off up to DAEMON_MAX_RETRY_INTERVAL
+                failures = self._failures[region_code] = self._failures.get(region_code, 0) + 1
+                delay = min(self._retry_interval * 2 ** (failures - 1), DAEMON_MAX_RETRY_INTERVAL)
+                self._retry_at[region_code] = now + delay
+                metrics.incr('fetch_retries', region=REGIONS[region_code].prefix)
+                logger.info(f"{region_code} is incomplete; retrying at {self._retry_at[region_code]:%H:%M:%S}")
+
+        now = datetime.now(VIETNAM_TZ)
+        return min(
+            self._retry_at[region_code] if region_code in self._retry_at else self._next_ready(region_code, now)
+            for region_code in self._regions
+        )
+
+    def run(self) -> None:
+        logger.info(f"Fetch daemon started for {', '.join(self._regions)}")
+        while not self._stop.is_set():
+            wake_at = self.run_once(datetime.now(VIETNAM_TZ))
+            if self._metrics_dir is not None:
+                metrics.write(self._metrics_dir, 'fetch-daemon') # Cumulative since the daemon started
+            delay = max((wake_at - datetime.now(VIETNAM_TZ)).total_seconds(), 0)
+            logger.info(f"Next check at {wake_at:%Y-%m-%d %H:%M:%S} ({delay / 60:.1f} min)")
+            self._stop.wait(delay)
+        logger.info("Fetch daemon stopped")
+
+
 if __name__ == '__main__':
     try:
         parser = argparse.ArgumentParser(description='Fetch lottery results for specific or all regions')
         parser.add_argument('--start', type=parse_date, help='Start date in format YYYY-MM-DD')
         parser.add_argument('--end', type=parse_date, help='End date in format YYYY-MM-DD')
-        parser.add_argument('--region', type=str, choices=['MB', 'MN', 'MT'], help='Specify lottery region to fetch.')
+        parser.add_argument('--region', type=str, choices=list(REGIONS), help='Specify lottery region to fetch.')
+        parser.add_argument('--base-url', type=str, help='Results site to fetch from (default: $LOTTERY_BASE_URL or https://xoso.com.vn).')
+        parser.add_argument('--daemon', action='store_true', help='Keep running and fetch each region after its daily draw.')
+        parser.add_argument('--metrics-dir', type=str, default=DEFAULT_METRICS_DIR, help='Directory for the JSON run report and Prometheus metrics. Empty to disable.')
+        parser.add_argument('--retry-interval', type=float, default=DAEMON_RETRY_INTERVAL.total_seconds() / 60, help='Minutes before retrying an incomplete day in daemon mode.')
+        parser.add_argument('--refetch-days', type=int, help=f'Latest stored days to fetch again with new ones to pick up corrections. Defaults to {DEFAULT_REFETCH_DAYS} with --daemon, 0 otherwise.')
         
         args = parser.parse_args()
-        start_date, end_date = get_date_range(args)
-        
-        if start_date > end_date:
-            parser.error("Start date cannot be after end date")
+        if args.refetch_days is None:
+            args.refetch_days = DEFAULT_REFETCH_DAYS if args.daemon else 0
 
-        region_map = {
-            'MB': ('XSMB', LotteryMB()),
-            'MN': ('XSMN', LotteryMN()),
-            'MT': ('XSMT', LotteryMT())
-        }
+        if args.daemon:
+            if args.start or args.end:
+                parser.error("--start and --end cannot be used with --daemon")
+            daemon = FetchDaemon([args.region] if args.region else list(REGIONS), timedelta(minutes=args.retry_interval),
+                                 Path(args.metrics_dir) if args.metrics_dir else None, args.base_url, args.refetch_days)
+            signal.signal(signal.SIGTERM, daemon.stop)
+            signal.signal(signal.SIGINT, daemon.stop)
+            daemon.run()
+            raise SystemExit(0)
 
-        regions_to_process = [args.region] if args.region else region_map.keys()
+        regions_to_process = [args.region] if args.region else list(REGIONS)
         
         success = {}
         for region_code in regions_to_process:
-            if region_code in region_map:
-                region_name, lottery_instance = region_map[region_code]
-                status = _fetch_lottery_data(lottery_instance, region_name, start_date, end_date)
-                success[region_name] = status
+            region_name = REGIONS[region_code].name
+            start_date, end_date = get_date_range(args, region_code)
+            if start_date > end_date:
+                if args.start:
+                    parser.error("Start date cannot be after end date")
+                logger.info(f"{region_name} is up to date. Nothing to fetch.")
+                continue
+            lottery_instance = create_lottery(region_code, args.base_url)
+            status = _fetch_lottery_data(lottery_instance, region_code, start_date, end_date, args.refetch_days)
+            success[region_name] = status
         
         # Log summary
         summary = []
@@ -146,6 +368,9 @@ if __name__ == '__main__':
         else:
             logger.info("No regions were processed.")
         
+        if args.metrics_dir:
+            metrics.write(Path(args.metrics_dir), 'fetch')
+        
     except Exception as e:
         error_msg = f"Critical error in lottery fetch process: {str(e)}"
         logger.error(error_msg)
\ No newline at end of file
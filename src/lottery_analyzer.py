@@ -1,52 +1,159 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
 import numpy as np
+import pandas as pd
+
+from .metrics import DEFAULT_METRICS_DIR, metrics
+from .models.regions import REGIONS
+
+NON_NUMBER_COLUMNS = ['date', 'province']
+
+
+def two_digits_file(region_code):
+    return f'{REGIONS[region_code].prefix}-2-digits.csv'
+
 
-def get_most_frequent_numbers(file_path):
+def load_region_data(file_path):
     """
-    Loads a CSV file, calculates the frequency of each two-digit number,
-    and returns the top 10 most frequent.
+    Loads a region's 2-digits CSV once so that every analysis can share it.
     """
     df = pd.read_csv(file_path)
-    all_numbers = pd.Series(dtype=str)
-    for col in df.columns:
-        if col not in ['date', 'province']:
-            all_numbers = pd.concat([all_numbers, df[col].astype(str).str.zfill(2)])
-    
-    frequency = all_numbers.value_counts()
-    return frequency.head(10)
-
-def get_least_recent_numbers(file_path):
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def _as_frame(data):
+    # Accept either an already loaded DataFrame or a path to a 2-digits CSV file
+    if isinstance(data, pd.DataFrame):
+        return data
+    return load_region_data(data)
+
+
+def _number_matrix(df):
+    number_columns = [col for col in df.columns if col not in NON_NUMBER_COLUMNS]
+    return df[number_columns].to_numpy(dtype=np.int64) % 100
+
+
+def get_most_frequent_numbers(data, top=10):
     """
-    Loads a CSV file and finds the 10 numbers that have not appeared for the longest time.
+    Calculates the frequency of each two-digit number and returns the top 10 most frequent.
+    Numbers with the same count are ordered by number, so the top 10 no longer depends
+    on the order the numbers first appear in the data (as value_counts did).
     """
-    df = pd.read_csv(file_path)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    all_possible_numbers = [str(i).zfill(2) for i in range(100)]
-    last_appearance = {}
-
-    for number in all_possible_numbers:
-        # Find the last date the number appeared in any prize column
-        last_date = df[df.isin([int(number)]).any(axis=1)]['date'].max()
-        if pd.notna(last_date):
-            last_appearance[number] = last_date
-
-    # Create a series with all numbers and their last appearance date
-    last_appearance_series = pd.Series(last_appearance).sort_values(ascending=True)
-    
+    df = _as_frame(data)
+    counts = np.bincount(_number_matrix(df).ravel(), minlength=100)
+
+    frequency = pd.Series(counts, index=[str(i).zfill(2) for i in range(100)])
+    frequency = frequency[frequency > 0].sort_values(ascending=False, kind='stable')
+    return frequency.head(top)
+
+
+def get_least_recent_numbers(data, top=10, now=None):
+    """
+    Finds the 10 numbers that have not appeared for the longest time.
+    Numbers last seen on the same date are ordered by number.
+    """
+    df = _as_frame(data)
+    numbers = _number_matrix(df)
+    if numbers.size == 0:
+        return pd.Series(dtype='int64')
+
+    # Mark which numbers appear in each row, then take the latest date per number
+    rows = np.repeat(np.arange(len(df)), numbers.shape[1])
+    appeared = np.zeros((len(df), 100), dtype=bool)
+    appeared[rows, numbers.ravel()] = True
+
+    dates = df['date'].to_numpy(dtype='datetime64[ns]').view('int64')
+    last_seen = np.where(appeared, dates[:, None], -1).max(axis=0)
+    last_appearance_series = pd.Series(last_seen, index=[str(i).zfill(2) for i in range(100)])
+    last_appearance_series = pd.to_datetime(last_appearance_series[last_appearance_series >= 0])
+
     # Calculate days since last appearance
-    days_since_appearance = (datetime.now() - last_appearance_series).dt.days
-    
+    now = now or datetime.now()
+    days_since_appearance = (now - last_appearance_series).dt.days
+
     # Return the top 10 numbers that have not appeared for the longest
-    return days_since_appearance.nlargest(10)
+    return days_since_appearance.nlargest(top)
+
+
+def analyze_region(region_code, file_path):
+    """
+    Runs every analysis for one region on a single load of its data.
+    """
+    if not os.path.exists(file_path):
+        return region_code, None
+
+    data_prefix = REGIONS[region_code].prefix # Metrics are labelled like the fetch stages: xsmb, xsmn, xsmt
+    with metrics.timer('analyzer.load_region_data', region=data_prefix):
+        df = load_region_data(file_path)
+    metrics.incr('rows_processed', len(df), region=data_prefix, stage='analyzer')
+    with metrics.timer('analyzer.get_most_frequent_numbers', region=data_prefix):
+        most_frequent = get_most_frequent_numbers(df)
+    with metrics.timer('analyzer.get_least_recent_numbers', region=data_prefix):
+        least_recent = get_least_recent_numbers(df)
+    return region_code, {
+        'most_frequent': most_frequent,
+        'least_recent': least_recent,
+    }
+
+
+def _analyze_region_in_worker(region_code, file_path):
+    # Metrics recorded in a pool worker are sent back with the result and merged by the parent
+    metrics.reset()
+    return analyze_region(region_code, file_path), metrics.snapshot()
+
+
+def run_analysis(data_dir, regions=None, workers=None):
+    """
+    Analyzes the requested regions in a process pool, one task per region.
+    Returns a dict of region code to results, or None when the data file is missing.
+    """
+    regions = regions or list(REGIONS)
+    tasks = [(region_code, os.path.join(data_dir, two_digits_file(region_code))) for region_code in regions]
+    workers = workers or len(tasks)
+
+    if workers <= 1:
+        results = [analyze_region(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = []
+            for result, snapshot in executor.map(_analyze_region_in_worker, *zip(*tasks)):
+                metrics.merge(snapshot)
+                results.append(result)
+
+    for region_code, result in results:
+        if result is None:
+            print(f"Data file not found for region {region_code}. Skipping analysis.", file=sys.stderr)
+        else:
+            print(f"Analyzed region: {region_code}", file=sys.stderr)
+    return dict(results)
+
+
+def results_to_json(results):
+    return {
+        region: None if result is None else {
+            name: {number: int(value) for number, value in series.items()}
+            for name, series in result.items()
+        }
+        for region, result in results.items()
+    }
+
 
 def plot_combined_analysis(data, title, ylabel, output_filename):
     """
     Plots a combined analysis for all regions on a single figure with subplots.
     """
+    # Imported here so that number-only runs never pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     regions = list(data.keys())
     fig, axes = plt.subplots(len(regions), 1, figsize=(12, 6 * len(regions)), constrained_layout=True)
     fig.suptitle(title, fontsize=18, weight='bold')
@@ -70,32 +177,12 @@ def plot_combined_analysis(data, title, ylabel, output_filename):
 
     plt.savefig(output_filename)
     plt.close()
-    print(f"Analysis image saved to {output_filename}")
+    print(f"Analysis image saved to {output_filename}", file=sys.stderr)
 
-if __name__ == "__main__":
-    script_dir = os.path.dirname(__file__)
-    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
-    
-    regions_files = {
-        'MB': 'xsmb-2-digits.csv',
-        'MN': 'xsmn-2-digits.csv',
-        'MT': 'xsmt-2-digits.csv'
-    }
 
-    most_frequent_data = {}
-    least_recent_data = {}
-
-    for region_code, filename in regions_files.items():
-        data_file_path = os.path.join(project_root, 'data', filename)
-        
-        if os.path.exists(data_file_path):
-            print(f"Analyzing region: {region_code}")
-            most_frequent_data[region_code] = get_most_frequent_numbers(data_file_path)
-            least_recent_data[region_code] = get_least_recent_numbers(data_file_path)
-        else:
-            print(f"Data file not found for region {region_code}: {data_file_path}. Skipping analysis.")
-            most_frequent_data[region_code] = None
-            least_recent_data[region_code] = None
+def plot_results(results, output_dir):
+    most_frequent_data = {region: result and result['most_frequent'] for region, result in results.items()}
+    least_recent_data = {region: result and result['least_recent'] for region, result in results.items()}
 
     # Plot and save the combined images
     if any(data is not None for data in most_frequent_data.values()):
@@ -103,7 +190,7 @@ if __name__ == "__main__":
             most_frequent_data,
             'Top 10 Most Frequent Numbers by Region',
             'Frequency Count',
-            os.path.join(project_root, 'data', 'most_frequent_numbers.png')
+            os.path.join(output_dir, 'most_frequent_numbers.png')
         )
 
     if any(data is not None for data in least_recent_data.values()):
@@ -111,7 +198,41 @@ if __name__ == "__main__":
             least_recent_data,
             'Top 10 Least Recent Numbers by Region',
             'Days Since Last Appearance',
-            os.path.join(project_root, 'data', 'least_recent_numbers.png')
+            os.path.join(output_dir, 'least_recent_numbers.png')
         )
 
-    print("Analysis complete.")
\ No newline at end of file
+
+def main(argv=None):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    data_dir = os.path.join(project_root, 'data')
+
+    parser = argparse.ArgumentParser(description='Analyze number frequencies for each lottery region')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to analyze (repeatable). Defaults to all regions.')
+    parser.add_argument('--no-charts', action='store_true', help='Skip rendering the PNG charts.')
+    parser.add_argument('--json', nargs='?', const='-', metavar='PATH', help='Write the results as JSON to PATH, or to stdout when no path is given.')
+    parser.add_argument('--workers', type=int, help='Number of worker processes. Defaults to one per region.')
+    parser.add_argument('--metrics-dir', type=str, default=os.path.join(project_root, DEFAULT_METRICS_DIR), help='Directory for the JSON run report and Prometheus metrics. Empty to disable.')
+    args = parser.parse_args(argv)
+
+    results = run_analysis(data_dir, args.region, args.workers)
+
+    if args.json:
+        payload = json.dumps(results_to_json(results), indent=2, ensure_ascii=False)
+        if args.json == '-':
+            print(payload)
+        else:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                f.write(payload)
+
+    if not args.no_charts:
+        with metrics.timer('analyzer.plot_results'):
+            plot_results(results, data_dir)
+
+    if args.metrics_dir:
+        metrics.write(Path(args.metrics_dir), 'analyzer')
+    print("Analysis complete.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .lottery_stats import draws_since_last, load_counts
+from .models.regions import REGIONS
+
+logger = logging.getLogger('vietnam-lottery')
+
+DEFAULT_WINDOWS = (7, 14, 30, 60, 90, 180, 365)
+DEFAULT_MAX_GAP = 365
+
+# Lô betting: one point on a number costs `stake_per_slot` for every prize number drawn
+# (27 per MB draw, 18 per MN/MT province) and pays `payout` for every occurrence.
+DEFAULT_STAKE_PER_SLOT = 1.0
+DEFAULT_PAYOUT = 80.0
+
+RESULT_COLUMNS = [
+    'strategy', 'window', 'k', 'threshold', 'draws', 'picks', 'avg_picks',
+    'hit_rate', 'hits', 'cost', 'payout', 'return', 'roi', 'win_draw_rate',
+]
+
+# Set once per worker process so that tasks do not re-pickle the history
+_counts: np.ndarray = np.zeros((0, 100), dtype=np.int64)
+
+
+def _init_worker(counts: np.ndarray) -> None:
+    global _counts
+    _counts = counts
+
+
+def rolling_counts(counts: np.ndarray, window: int) -> np.ndarray:
+    """Occurrences of every number over the last `window` draws, including the current one."""
+    cum = np.vstack([np.zeros((1, counts.shape[1]), dtype=np.int64), np.cumsum(counts, axis=0)])
+    t = np.arange(counts.shape[0])
+    return cum[t + 1] - cum[np.maximum(t + 1 - window, 0)]
+
+
+def _summarize(occurrences: np.ndarray, appeared: np.ndarray, picks: np.ndarray, draw_cost: np.ndarray,
+               payout: float) -> Dict[str, np.ndarray]:
+    """
+    Aggregates per-draw curves of shape (draws, settings) into totals per setting.
+    `draw_cost` is the cost of one point in each evaluated draw.
+    """
+    returns = occurrences * payout - picks * draw_cost[:, None]
+    total_picks = picks.sum(axis=0)
+    cost = (picks * draw_cost[:, None]).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'draws': np.full(picks.shape[1], picks.shape[0]),
+            'picks': total_picks,
+            'avg_picks': total_picks / picks.shape[0],
+            'hit_rate': appeared.sum(axis=0) / total_picks,
+            'hits': occurrences.sum(axis=0),
+            'cost': cost,
+            'payout': occurrences.sum(axis=0) * payout,
+            'return': returns.sum(axis=0),
+            'roi': returns.sum(axis=0) / cost,
+            'win_draw_rate': (returns > 0).mean(axis=0),
+        }
+
+
+def top_k_curves(score: np.ndarray, outcome: np.ndarray, draw_cost: np.ndarray, payout: float) -> Dict[str, np.ndarray]:
+    """
+    Evaluates "pick the k highest-scoring numbers" for every k = 1..100 at once.
+    `score` is known after draw t and `outcome` holds the counts of draw t + 1.
+    Ties are broken by the smaller number.
+    """
+    order = np.argsort(-score, axis=1, kind='stable')
+    ranked = np.take_along_axis(outcome, order, axis=1)
+    occurrences = np.cumsum(ranked, axis=1)
+    appeared = np.cumsum(ranked > 0, axis=1)
+    picks = np.broadcast_to(np.arange(1, score.shape[1] + 1), score.shape)
+    return _summarize(occurrences, appeared, picks, draw_cost, payout)
+
+
+def threshold_curves(score: np.ndarray, outcome: np.ndarray, draw_cost: np.ndarray, payout: float,
+                     max_threshold: int) -> Dict[str, np.ndarray]:
+    """
+    Evaluates "pick every number with score >= t" for every t = 1..max_threshold at once,
+    using per-draw histograms of the (integer) score and a reverse cumulative sum.
+    """
+    n_draws = score.shape[0]
+    levels = max_threshold + 1
+    clipped = np.clip(score, 0, max_threshold)
+    index = (np.arange(n_draws)[:, None] * levels + clipped).ravel()
+
+    def histogram(weights: Optional[np.ndarray]) -> np.ndarray:
+        hist = np.bincount(index, weights=weights, minlength=n_draws * levels).reshape(n_draws, levels)
+        return np.cumsum(hist[:, ::-1], axis=1)[:, ::-1][:, 1:]
+
+    picks = histogram(None)
+    occurrences = histogram(outcome.ravel().astype(np.float64))
+    appeared = histogram((outcome.ravel() > 0).astype(np.float64))
+    return _summarize(occurrences, appeared, picks, draw_cost, payout)
+
+
+def _to_frame(strategy: str, window: Optional[int], curves: Dict[str, np.ndarray], param: str) -> pd.DataFrame:
+    n_settings = len(curves['picks'])
+    df = pd.DataFrame(curves)
+    df.insert(0, 'strategy', strategy)
+    df.insert(1, 'window', window)
+    df.insert(2, 'k', np.arange(1, n_settings + 1) if param == 'k' else None)
+    df.insert(3, 'threshold', np.arange(1, n_settings + 1) if param == 'threshold' else None)
+    # Settings that never pick anything are not strategies worth reporting
+    return df[df['picks'] > 0]
+
+
+def evaluate_strategy(strategy: str, window: Optional[int], start: int, stake_per_slot: float, payout: float,
+                      max_gap: int) -> pd.DataFrame:
+    """
+    Evaluates one strategy family for all of its parameter values over draws
+    `start`..end of the history installed in this process.
+    """
+    counts = _counts
+    outcome = counts[start + 1:]
+    draw_cost = outcome.sum(axis=1) * stake_per_slot
+
+    if strategy in ('hot', 'frequency'):
+        score = rolling_counts(counts, window)[start:-1]
+    elif strategy in ('cold', 'gap'):
+        score = draws_since_last(counts)[start:-1]
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    if strategy in ('hot', 'cold'):
+        curves = top_k_curves(score, outcome, draw_cost, payout)
+        return _to_frame(strategy, window, curves, 'k')
+
+    max_threshold = int(score.max()) if strategy == 'frequency' else max_gap
+    curves = threshold_curves(score, outcome, draw_cost, payout, max(max_threshold, 1))
+    return _to_frame(strategy, window, curves, 'threshold')
+
+
+def run_backtest(counts: np.ndarray, windows: Sequence[int] = DEFAULT_WINDOWS, warmup: Optional[int] = None,
+                 stake_per_slot: float = DEFAULT_STAKE_PER_SLOT, payout: float = DEFAULT_PAYOUT,
+                 max_gap: int = DEFAULT_MAX_GAP, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Backtests hot (top-k by recent frequency), cold (top-k by gap), frequency threshold
+    and gap threshold strategies over a (draws x 100) count matrix.
+    Every strategy is evaluated on the same draws, after `warmup` draws of history
+    (defaults to the longest window). Strategy families run in a process pool.
+    Raises ValueError when there are fewer than two draws, as every evaluated
+    draw needs at least one draw of history before it.
+    """
+    if counts.shape[0] < 2:
+        raise ValueError(f"Backtesting needs at least 2 draws, the history has {counts.shape[0]}")
+    warmup = max(windows) if warmup is None else warmup
+    if counts.shape[0] - 1 <= warmup:
+        warmup = 0
+        logger.warning("History is shorter than the warmup period. Evaluating from the first draw.")
+
+    tasks: List[Tuple[str, Optional[int]]] = [('cold', None), ('gap', None)]
+    tasks += [(strategy, window) for window in windows for strategy in ('hot', 'frequency')]
+
+    args = [(strategy, window, warmup, stake_per_slot, payout, max_gap) for strategy, window in tasks]
+    if workers == 1:
+        _init_worker(counts)
+        frames = [evaluate_strategy(*task) for task in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(counts,)) as executor:
+            frames = list(executor.map(evaluate_strategy, *zip(*args)))
+
+    results = pd.concat(frames, ignore_index=True)[RESULT_COLUMNS]
+    return results.astype({'window': 'Int64', 'k': 'Int64', 'threshold': 'Int64'})
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Backtest number-picking strategies against history')
+    parser.add_argument('--region', type=str, default='MB', choices=list(REGIONS), help='Region to backtest.')
+    parser.add_argument('--windows', type=int, nargs='+', default=list(DEFAULT_WINDOWS), help='Look-back windows (draws) for hot/frequency strategies.')
+    parser.add_argument('--warmup', type=int, help='Draws of history before evaluation starts. Defaults to the longest window.')
+    parser.add_argument('--stake-per-slot', type=float, default=DEFAULT_STAKE_PER_SLOT, help='Cost of one point per prize number drawn.')
+    parser.add_argument('--payout', type=float, default=DEFAULT_PAYOUT, help='Payout per occurrence of a picked number.')
+    parser.add_argument('--max-gap', type=int, default=DEFAULT_MAX_GAP, help='Largest gap threshold evaluated.')
+    parser.add_argument('--workers', type=int, help='Worker processes. Defaults to the number of CPUs.')
+    parser.add_argument('--sort', type=str, default='roi', choices=['roi', 'return', 'hit_rate'], help='Column to rank results by.')
+    parser.add_argument('--top', type=int, default=20, help='Rows to print.')
+    parser.add_argument('--output', type=str, help='Write the full results table to this CSV or Parquet path.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    dates, counts = load_counts(args.region)
+    try:
+        results = run_backtest(counts, args.windows, args.warmup, args.stake_per_slot, args.payout, args.max_gap, args.workers)
+    except ValueError as e:
+        logger.error(f"Cannot backtest {args.region}: {e}")
+        return
+    logger.info(f"Evaluated {len(results)} strategy settings over {len(dates)} {args.region} draws")
+
+    ranked = results.sort_values(args.sort, ascending=False, kind='stable')
+    print(ranked.head(args.top).to_string(index=False))
+
+    if args.output:
+        if args.output.endswith('.parquet'):
+            results.to_parquet(args.output, index=False)
+        else:
+            results.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
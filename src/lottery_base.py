@@ -1,29 +1,51 @@
 import json
 import logging
+import os
 from abc import ABC, abstractmethod
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List, Type, TypeVar
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
 import pandas as pd
 from bs4 import BeautifulSoup # Added this import
 from cloudscraper import CloudScraper
 from pydantic import BaseModel
 
+from .data_files import atomic_write, latest_csv_date, read_header
+from .manifest import build_manifest, file_entry, write_manifest
+from .metrics import metrics
+
 logger = logging.getLogger('vietnam-lottery')
 
 # Define a type variable for Pydantic models
 T = TypeVar('T', bound=BaseModel)
 
+# Results site; LOTTERY_BASE_URL (or --base-url) points the fetchers elsewhere, e.g. at a local stub
+DEFAULT_BASE_URL = 'https://xoso.com.vn'
+BASE_URL_ENV = 'LOTTERY_BASE_URL'
+
+# Draw days per Parquet row group, whatever the number of provinces per day. Smaller groups
+# skip more data on short date ranges, but every group adds footer metadata for each column,
+# which outweighs the savings well before a month per group (see bench_parquet_reads).
+PARQUET_ROW_GROUP_DAYS = 365
+
+
+def parquet_row_group_size(df: pd.DataFrame) -> int:
+    """Rows of a date-sorted frame that cover about PARQUET_ROW_GROUP_DAYS draw days."""
+    rows_per_day = len(df) / max(df['date'].nunique(), 1)
+    return max(round(rows_per_day * PARQUET_ROW_GROUP_DAYS), 1)
+
 class LotteryBase(ABC):
-    def __init__(self, data_prefix: str, ResultModel: Type[T], ResultListModel: Type[BaseModel]) -> None:
+    def __init__(self, data_prefix: str, ResultModel: Type[T], ResultListModel: Type[BaseModel], base_url: Optional[str] = None) -> None:
         self._http = CloudScraper()
+        self._base_url = (base_url or os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL).rstrip('/')
         self._data: Dict[date, Any] = {} # Can be ResultModel or List[ResultModel]
         self._raw_data: pd.DataFrame = pd.DataFrame()
         self._2_digits_data: pd.DataFrame = pd.DataFrame()
         self._sparse_data: pd.DataFrame = pd.DataFrame()
         self._begin_date = date.today()
         self._last_date = date.today()
+        self._max_date: Optional[date] = None # Latest date stored in _data, kept up to date on every insert
         self._data_prefix = data_prefix
         self._ResultModel = ResultModel
         self._ResultListModel = ResultListModel
@@ -47,6 +69,7 @@ class LotteryBase(ABC):
                 logger.info(f"Creating {filename}")
                 file_path.write_text(content, encoding='utf-8')
 
+    @metrics.timed('load')
     def load(self) -> None:
         try:
             file_path = Path('data') / f'{self._data_prefix}.json'
@@ -57,23 +80,28 @@ class LotteryBase(ABC):
             with open(file_path, 'r', encoding='utf-8') as f:
                 json_data = json.load(f)
             
-            data = [self._ResultModel.model_validate(item) for item in json_data]
+            data = self._validate_records(json_data)
 
             # Handle both single and list of results per date
             for d in data:
                 if isinstance(d, list): # For multi-province results
                     if d[0].date not in self._data:
-                        self._data[d[0].date] = []
+                        self._store_result(d[0].date, [])
                     self._data[d[0].date].extend(d)
                 else: # For single result per date
-                    self._data[d.date] = d
+                    self._store_result(d.date, d)
             
             self.generate_dataframes()
             logger.info(f"Successfully loaded existing data from {file_path}")
         except Exception as e:
             logger.warning(f"Could not load existing data from {file_path}: {e}")
 
-    def dump(self) -> None:
+    @metrics.timed('dump')
+    def dump(self, appended_since: Optional[date] = None) -> None:
+        """
+        Saves the data files. With `appended_since`, the draws up to that date are
+        known to be unchanged on disk, so the CSV files only get the later rows appended.
+        """
         if not self._data:
             logger.info("No data to save")
             return
@@ -91,25 +119,106 @@ class LotteryBase(ABC):
         
         # Save JSON
         json_file_path = Path('data') / f'{self._data_prefix}.json'
-        with open(json_file_path, 'w', encoding='utf-8') as f:
+        with atomic_write(json_file_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump([item.model_dump(mode='json') for item in data_list], f, indent=2, ensure_ascii=False)
+        self._record_written(json_file_path, len(data_list))
         
         logger.info(f"Saved {len(data_list)} results to {json_file_path}")
         
         # Save DataFrames
-        self._dump_dataframe(self._raw_data, self._data_prefix)
-        self._dump_dataframe(self._2_digits_data, f'{self._data_prefix}-2-digits')
-        self._dump_dataframe(self._sparse_data, f'{self._data_prefix}-sparse')
+        self._dump_dataframe(self._raw_data, self._data_prefix, appended_since)
+        self._dump_dataframe(self._2_digits_data, f'{self._data_prefix}-2-digits', appended_since)
+        self._dump_dataframe(self._sparse_data, f'{self._data_prefix}-sparse', appended_since)
 
-    def _dump_dataframe(self, df: pd.DataFrame, file_name_prefix: str) -> None:
+    def _dump_dataframe(self, df: pd.DataFrame, file_name_prefix: str, appended_since: Optional[date] = None) -> None:
         if not df.empty:
             csv_path = Path('data') / f'{file_name_prefix}.csv'
             parquet_path = Path('data') / f'{file_name_prefix}.parquet'
             
-            df.to_csv(csv_path, index=False)
-            df.to_parquet(parquet_path, index=False)
+            # Rows are kept in date order so readers can find the latest date from the tail of the file
+            df = df.sort_values('date', kind='stable')
+            # Appending is only safe when the file on disk ends exactly where the unchanged draws do
+            if (appended_since is not None and csv_path.exists() and read_header(csv_path) == list(df.columns)
+                    and latest_csv_date(csv_path) == appended_since):
+                new_rows = df[df['date'] > pd.Timestamp(appended_since)]
+                size = csv_path.stat().st_size
+                new_rows.to_csv(csv_path, mode='a', header=False, index=False)
+                self._record_written(csv_path, len(new_rows), csv_path.stat().st_size - size)
+            else:
+                with atomic_write(csv_path) as tmp_path:
+                    df.to_csv(tmp_path, index=False)
+                self._record_written(csv_path, len(df))
+            # Date-sorted row groups with date/province statistics let readers skip
+            # everything outside the dates they ask for (see dataset.py)
+            statistics = [col for col in ('date', 'province') if col in df.columns]
+            with atomic_write(parquet_path) as tmp_path:
+                df.to_parquet(tmp_path, index=False, row_group_size=parquet_row_group_size(df), write_statistics=statistics)
+            self._record_written(parquet_path, len(df))
             logger.info(f"Saved {len(df)} records to {csv_path} and {parquet_path}")
 
+    def write_manifest(self) -> None:
+        """
+        Records what dump() and generate_and_dump_sparse_json() wrote, so freshness
+        checks never need to load the data. Call it after every other data file is
+        written, so the manifest never lists a file older than the one on disk.
+        """
+        records = [item for val in self._data.values() for item in (val if isinstance(val, list) else [val])]
+        data_dir = Path('data')
+        files = {f'{self._data_prefix}.json': file_entry(data_dir / f'{self._data_prefix}.json', len(records))}
+        for df, file_name_prefix in [
+            (self._raw_data, self._data_prefix),
+            (self._2_digits_data, f'{self._data_prefix}-2-digits'),
+            (self._sparse_data, f'{self._data_prefix}-sparse'),
+        ]:
+            if not df.empty:
+                for file_name in (f'{file_name_prefix}.csv', f'{file_name_prefix}.parquet'):
+                    files[file_name] = file_entry(data_dir / file_name, len(df))
+        sparse_json_path = data_dir / f'{self._data_prefix}-sparse.json'
+        if sparse_json_path.exists():
+            files[sparse_json_path.name] = file_entry(sparse_json_path, len(self._data))
+
+        provinces = [item.province for item in records if hasattr(item, 'province')]
+        write_manifest(self._data_prefix, build_manifest(self._data_prefix, self._data.keys(), len(records), provinces, files))
+
+    def _record_written(self, file_path: Path, rows: int, size: Optional[int] = None) -> None:
+        size = file_path.stat().st_size if size is None else size
+        metrics.incr('bytes_written', size, region=self._data_prefix, file=file_path.name)
+        metrics.incr('rows_processed', rows, region=self._data_prefix, stage='dump', file=file_path.name)
+
+    def _validate_records(self, json_data: List[Dict]) -> List[BaseModel]:
+        with metrics.timer('validate', region=self._data_prefix):
+            data = [self._ResultModel.model_validate(item) for item in json_data]
+        metrics.incr('rows_processed', len(data), region=self._data_prefix, stage='validate')
+        return data
+
+    @metrics.timed('validate')
+    def _build_result(self, **fields) -> BaseModel:
+        return self._ResultModel(**fields)
+
+    def _page_url(self, selected_date: date) -> str:
+        return f'{self._base_url}/{self._data_prefix}-{selected_date:%d-%m-%Y}.html'
+
+    def _get(self, url: str) -> Any:
+        """GETs a results page through the shared session, counting requests and downloaded bytes."""
+        try:
+            with metrics.timer('http', region=self._data_prefix):
+                resp = self._http.get(url)
+        except Exception:
+            metrics.incr('http_requests', region=self._data_prefix, status='error')
+            raise
+        metrics.incr('http_requests', region=self._data_prefix, status=resp.status_code)
+        metrics.incr('http_bytes_downloaded', len(resp.content), region=self._data_prefix)
+        return resp
+
+    def _parse_page(self, text: str) -> BeautifulSoup:
+        with metrics.timer('parse', region=self._data_prefix):
+            return BeautifulSoup(text, 'lxml')
+
+    def _store_result(self, selected_date: date, value: Any) -> None:
+        self._data[selected_date] = value
+        if self._max_date is None or selected_date > self._max_date:
+            self._max_date = selected_date
+
     @abstractmethod
     def fetch(self, selected_date: date) -> Any:
         """Abstract method to fetch data for a specific date."""
@@ -120,6 +229,7 @@ class LotteryBase(ABC):
         """Abstract method to generate pandas DataFrames from fetched data."""
         pass
 
+    @metrics.timed('dump_sparse_json')
     def generate_and_dump_sparse_json(self) -> None:
         """Generates a sparse representation of 2-digit number frequencies and saves it to a JSON file."""
         if not self._data:
@@ -159,28 +269,17 @@ class LotteryBase(ABC):
         # Save to JSON file
         file_path = Path('data') / f'{self._data_prefix}-sparse.json'
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with atomic_write(file_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(sparse_records, f, indent=2, ensure_ascii=False)
+            self._record_written(file_path, len(sparse_records))
             logger.info(f"Successfully saved sparse data to {file_path}")
         except Exception as e:
             logger.error(f"Error saving sparse JSON to {file_path}: {e}")
 
     def get_last_date(self) -> date:
-        if not self._data:
+        if self._max_date is None:
             return self._last_date # Returns today's date from init if no data
-        
-        # Find the maximum date from all entries
-        max_date = self._begin_date # Initialize with a default or earliest possible date
-        for key, value in self._data.items():
-            if isinstance(value, list) and value: # For multi-province results
-                max_date = max(max_date, max(d.date for d in value))
-            elif isinstance(value, BaseModel): # For single result per date
-                max_date = max(max_date, value.date)
-            else: # If key is already a date
-                max_date = max(max_date, key)
-        
-        self._last_date = max_date
-        return self._last_date
+        return self._max_date
 
     def get_raw_data(self) -> pd.DataFrame:
         return self._raw_data
@@ -192,11 +291,12 @@ class LotteryBase(ABC):
         return self._sparse_data
 
 class LotteryMultiProvinceBase(LotteryBase):
-    def __init__(self, data_prefix: str, ResultModel: Type[T], ResultListModel: Type[BaseModel]) -> None:
-        super().__init__(data_prefix, ResultModel, ResultListModel)
+    def __init__(self, data_prefix: str, ResultModel: Type[T], ResultListModel: Type[BaseModel], base_url: Optional[str] = None) -> None:
+        super().__init__(data_prefix, ResultModel, ResultListModel, base_url)
         # Override _data to specifically store list of results per date
         self._data: Dict[date, List[ResultModel]] = {}
 
+    @metrics.timed('load')
     def load(self) -> None:
         try:
             file_path = Path('data') / f'{self._data_prefix}.json'
@@ -207,11 +307,11 @@ class LotteryMultiProvinceBase(LotteryBase):
             with open(file_path, 'r', encoding='utf-8') as f:
                 json_data = json.load(f)
 
-            data = [self._ResultModel.model_validate(item) for item in json_data]
+            data = self._validate_records(json_data)
 
             for d in data:
                 if d.date not in self._data:
-                    self._data[d.date] = []
+                    self._store_result(d.date, [])
                 self._data[d.date].append(d)
             
             self.generate_dataframes()
@@ -219,7 +319,12 @@ class LotteryMultiProvinceBase(LotteryBase):
         except Exception as e:
             logger.warning(f"Could not load existing data from {file_path}: {e}")
 
-    def dump(self) -> None:
+    @metrics.timed('dump')
+    def dump(self, appended_since: Optional[date] = None) -> None:
+        """
+        Saves the data files. With `appended_since`, the draws up to that date are
+        known to be unchanged on disk, so the CSV files only get the later rows appended.
+        """
         if not self._data:
             logger.info("No data to save")
             return
@@ -228,30 +333,31 @@ class LotteryMultiProvinceBase(LotteryBase):
         root.sort(key=lambda x: x.date) # Ensure sorted for consistent output
 
         json_file_path = Path('data') / f'{self._data_prefix}.json'
-        with open(json_file_path, 'w', encoding='utf-8') as f:
+        with atomic_write(json_file_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
             # Use model_dump() for each item and then json.dump for the list
             json_data = [item.model_dump(mode='json') for item in root]
             # import json # Import json here to avoid circular dependency if pydantic uses it
             json.dump(json_data, f, indent=2, ensure_ascii=False) # default=str for date objects
+        self._record_written(json_file_path, len(root))
         logger.info(f"Saved {len(root)} results to {json_file_path}")
 
-        self._dump_dataframe(self._raw_data, self._data_prefix)
-        self._dump_dataframe(self._2_digits_data, f'{self._data_prefix}-2-digits')
-        self._dump_dataframe(self._sparse_data, f'{self._data_prefix}-sparse')
+        self._dump_dataframe(self._raw_data, self._data_prefix, appended_since)
+        self._dump_dataframe(self._2_digits_data, f'{self._data_prefix}-2-digits', appended_since)
+        self._dump_dataframe(self._sparse_data, f'{self._data_prefix}-sparse', appended_since)
 
     def fetch(self, selected_date: date) -> List[T]:
-        url = f'https://xoso.com.vn/{self._data_prefix}-{selected_date:%d-%m-%Y}.html'
+        url = self._page_url(selected_date)
         logger.info(f"Fetching URL: {url}")
         
         try:
-            resp = self._http.get(url)
+            resp = self._get(url)
             logger.info(f"Response status: {resp.status_code}")
             
             if resp.status_code != 200:
                 logger.error(f"Failed to fetch URL {url}, status code: {resp.status_code}")
                 return []
 
-            soup = BeautifulSoup(resp.text, 'lxml')
+            soup = self._parse_page(resp.text)
             table = soup.find('table', class_='table-result')
             
             if not table:
@@ -284,6 +390,7 @@ class LotteryMultiProvinceBase(LotteryBase):
                     numbers_str = cell.text.strip().split()
                     # Check for '...' or empty strings before conversion
                     if any(n == '...' or not n for n in numbers_str):
+                        metrics.incr('incomplete_pages', region=self._data_prefix)
                         logger.warning(f"Skipping {province} for {selected_date} due to incomplete data: {numbers_str}")
                         return [] # Return empty list to signal incomplete data for the day
                     try:
@@ -299,14 +406,15 @@ class LotteryMultiProvinceBase(LotteryBase):
                     prizes = province_results[province]
                     # This part needs to be implemented by the concrete class
                     # as prize mapping is specific to each lottery type (MN/MT)
-                    result_instance = self._create_result_model(selected_date, province, prizes)
+                    with metrics.timer('validate', region=self._data_prefix):
+                        result_instance = self._create_result_model(selected_date, province, prizes)
                     results.append(result_instance)
                     logger.info(f"Successfully processed data for {province} on {selected_date}")
                 except Exception as e:
                     logger.error(f"Error creating result for {province} on {selected_date}: {e}")
 
             if results:
-                self._data[selected_date] = results
+                self._store_result(selected_date, results)
                 logger.info(f"Successfully fetched {len(results)} results for date {selected_date}")
                 return results
             else:
@@ -0,0 +1,260 @@
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .lottery_stats import draws_since_last
+from .models.regions import REGIONS
+
+logger = logging.getLogger('vietnam-lottery')
+
+LAGS = (1, 2, 3, 7)
+WINDOWS = (7, 14, 30, 90)
+FEATURE_COLUMNS = (
+    [f'lag_{k}' for k in LAGS]
+    + [f'roll_{w}' for w in WINDOWS]
+    + ['expanding_mean', 'gap', 'target_weekday']
+)
+FEATURE_STORE_VERSION = 1
+DEFAULT_TEST_SIZE = 30 # Draws per walk-forward test fold, shared by the API and the CLI
+
+
+def draw_counts(two_digits_df: pd.DataFrame) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Counts how often each 2-digit number appears per draw date in 2-digits data.
+    Provinces drawn on the same date are merged into a single regional draw.
+    """
+    if two_digits_df.empty:
+        return pd.DatetimeIndex([]), np.zeros((0, 100), dtype=np.int64)
+
+    dates = pd.to_datetime(two_digits_df['date'])
+    unique_dates, row_date = np.unique(dates.to_numpy(), return_inverse=True)
+    number_columns = [col for col in two_digits_df.columns if col not in ('date', 'province')]
+    numbers = two_digits_df[number_columns].to_numpy(dtype=np.int64) % 100
+
+    flat = (np.repeat(row_date, numbers.shape[1]) * 100 + numbers.ravel())
+    counts = np.bincount(flat, minlength=len(unique_dates) * 100).reshape(len(unique_dates), 100)
+    return pd.DatetimeIndex(unique_dates), counts
+
+
+def build_features(dates: pd.DatetimeIndex, counts: np.ndarray, start: int = 0) -> pd.DataFrame:
+    """
+    Builds one row per (draw, number) with lagged and rolling features known after
+    that draw, and `target` = whether the number appears in the following draw
+    (NaN for the last draw, which is the one we predict for).
+    Only draws from `start` on get rows; earlier draws still feed their features.
+    """
+    n_draws, n_numbers = counts.shape
+    c = counts.astype(np.float32)
+    cum = np.vstack([np.zeros((1, n_numbers), dtype=np.float64), np.cumsum(counts, axis=0, dtype=np.float64)])
+    t = np.arange(start, n_draws)
+
+    features: Dict[str, np.ndarray] = {}
+    for k in LAGS:
+        source = t - k + 1
+        features[f'lag_{k}'] = np.where((source >= 0)[:, None], c[np.maximum(source, 0)], 0).astype(np.float32)
+
+    for w in WINDOWS:
+        lo = np.maximum(t + 1 - w, 0)
+        span = np.minimum(w, t + 1).astype(np.float64)[:, None]
+        features[f'roll_{w}'] = ((cum[t + 1] - cum[lo]) / span).astype(np.float32)
+
+    features['expanding_mean'] = (cum[t + 1] / (t + 1)[:, None]).astype(np.float32)
+
+    features['gap'] = draws_since_last(counts)[start:].astype(np.float32)
+
+    next_dates = dates[1:].append(pd.DatetimeIndex([dates[-1] + pd.Timedelta(days=1)])) if n_draws else dates
+    features['target_weekday'] = np.repeat(np.asarray(next_dates[start:].weekday, dtype=np.float32)[:, None], n_numbers, axis=1)
+
+    target = np.full((len(t), n_numbers), np.nan, dtype=np.float32)
+    target[:-1] = counts[t[:-1] + 1] > 0
+
+    frame = pd.DataFrame({name: values.ravel() for name, values in features.items()})
+    frame.insert(0, 'draw', np.repeat(t, n_numbers))
+    frame.insert(1, 'date', np.repeat(dates[start:].to_numpy(), n_numbers))
+    frame.insert(2, 'number', np.tile(np.arange(n_numbers, dtype=np.int16), len(t)))
+    frame['target'] = target.ravel()
+    return frame
+
+
+class FeatureStore:
+    """
+    Caches the feature table of a region in data/<prefix>-features.parquet,
+    keyed by a fingerprint of the per-draw counts it was built from. When the
+    cached table covers a prefix of the current draws, only the new draws (and
+    the last cached one, whose target was unknown) are computed and appended.
+    """
+
+    def __init__(self, data_prefix: str) -> None:
+        self._data_prefix = data_prefix
+        self._file_path = Path('data') / f'{data_prefix}-features.parquet'
+
+    @staticmethod
+    def fingerprint(dates: pd.DatetimeIndex, counts: np.ndarray) -> str:
+        digest = hashlib.sha256()
+        digest.update(str(FEATURE_STORE_VERSION).encode())
+        digest.update(dates.to_numpy(dtype='datetime64[ns]').tobytes())
+        digest.update(np.ascontiguousarray(counts, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def _load(self) -> Tuple[Optional[pd.DataFrame], int, str]:
+        """Returns the cached table, the number of draws it was built from and its fingerprint."""
+        import pyarrow.parquet as pq
+
+        if not self._file_path.exists():
+            return None, 0, ''
+        try:
+            table = pq.read_table(self._file_path)
+            metadata = table.schema.metadata or {}
+            return table.to_pandas(), int(metadata.get(b'draws', b'0')), metadata.get(b'fingerprint', b'').decode()
+        except Exception as e:
+            logger.warning(f"Could not read feature store {self._file_path}: {e}")
+            return None, 0, ''
+
+    def get(self, dates: pd.DatetimeIndex, counts: np.ndarray) -> pd.DataFrame:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fingerprint = self.fingerprint(dates, counts)
+        cached, cached_draws, cached_fingerprint = self._load()
+        if cached is not None and cached_fingerprint == fingerprint:
+            logger.info(f"Loaded cached features from {self._file_path}")
+            return cached
+
+        if (cached is not None and 0 < cached_draws <= len(dates)
+                and cached_fingerprint == self.fingerprint(dates[:cached_draws], counts[:cached_draws])):
+            start = cached_draws - 1
+            features = pd.concat([cached[cached['draw'] < start], build_features(dates, counts, start)], ignore_index=True)
+            logger.info(f"Appended features for {len(dates) - cached_draws} new draws to {self._file_path}")
+        else:
+            features = build_features(dates, counts)
+
+        table = pa.Table.from_pandas(features, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'fingerprint': fingerprint.encode(),
+            b'draws': str(len(dates)).encode(),
+        })
+        pq.write_table(table, self._file_path)
+        logger.info(f"Saved {len(features)} feature rows to {self._file_path}")
+        return features
+
+
+def make_model():
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    return HistGradientBoostingClassifier(max_iter=100, learning_rate=0.05, random_state=0)
+
+
+def _evaluate_fold(features: pd.DataFrame, train_end: int, test_end: int, top_k: int) -> Dict:
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    train = features[features['draw'] < train_end]
+    test = features[(features['draw'] >= train_end) & (features['draw'] < test_end)]
+
+    model = make_model()
+    model.fit(train[FEATURE_COLUMNS].to_numpy(), train['target'].to_numpy())
+    proba = model.predict_proba(test[FEATURE_COLUMNS].to_numpy())[:, 1]
+
+    y = test['target'].to_numpy()
+    # Top-k picks per draw: rank the 100 numbers of every test draw by predicted probability
+    per_draw = proba.reshape(-1, 100)
+    picks = np.argsort(-per_draw, axis=1, kind='stable')[:, :top_k]
+    picked_hits = np.take_along_axis(y.reshape(-1, 100), picks, axis=1)
+
+    return {
+        'train_draws': int(train_end),
+        'test_draws': int(test_end - train_end),
+        'log_loss': float(log_loss(y, proba, labels=[0, 1])),
+        'roc_auc': float(roc_auc_score(y, proba)) if 0 < y.sum() < len(y) else float('nan'),
+        'base_rate': float(y.mean()),
+        f'top{top_k}_hit_rate': float(picked_hits.mean()),
+    }
+
+
+def walk_forward_backtest(features: pd.DataFrame, n_folds: int = 5, test_size: int = DEFAULT_TEST_SIZE,
+                          top_k: int = 10, n_jobs: int = -1) -> pd.DataFrame:
+    """
+    Expanding-window backtest: each fold trains on every draw before its test block
+    and is evaluated on the next `test_size` draws. Folds are fitted in parallel.
+    """
+    from joblib import Parallel, delayed
+
+    labeled_draws = int(features.loc[features['target'].notna(), 'draw'].max()) + 1
+    first_test = labeled_draws - n_folds * test_size
+    if first_test <= 0:
+        raise ValueError(f"Not enough history for {n_folds} folds of {test_size} draws ({labeled_draws} labeled draws)")
+
+    labeled = features[features['target'].notna()]
+    bounds = [(first_test + i * test_size, first_test + (i + 1) * test_size) for i in range(n_folds)]
+    folds = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(labeled, train_end, test_end, top_k) for train_end, test_end in bounds
+    )
+    return pd.DataFrame(folds).rename_axis('fold').reset_index()
+
+
+def predict_next(features: pd.DataFrame, top_k: int = 10) -> pd.DataFrame:
+    """Trains on the full labeled history and ranks numbers for the next draw."""
+    labeled = features[features['target'].notna()]
+    latest = features[features['draw'] == features['draw'].max()]
+
+    model = make_model()
+    model.fit(labeled[FEATURE_COLUMNS].to_numpy(), labeled['target'].to_numpy())
+    proba = model.predict_proba(latest[FEATURE_COLUMNS].to_numpy())[:, 1]
+
+    ranking = pd.DataFrame({'number': latest['number'].map(lambda n: str(n).zfill(2)).to_numpy(), 'probability': proba})
+    return ranking.sort_values('probability', ascending=False, kind='stable').head(top_k).reset_index(drop=True)
+
+
+def run_region(region_code: str, n_folds: int, test_size: int, top_k: int, n_jobs: int) -> Dict:
+    data_prefix = REGIONS[region_code].prefix
+    two_digits = pd.read_csv(Path('data') / f'{data_prefix}-2-digits.csv')
+    dates, counts = draw_counts(two_digits)
+    features = FeatureStore(data_prefix).get(dates, counts)
+
+    backtest = walk_forward_backtest(features, n_folds=n_folds, test_size=test_size, top_k=top_k, n_jobs=n_jobs)
+    prediction = predict_next(features, top_k=top_k)
+    logger.info(f"{region_code} walk-forward backtest:\n{backtest.to_string(index=False)}")
+
+    return {
+        'region': region_code,
+        'last_date': dates[-1].date().isoformat(),
+        'backtest': backtest.to_dict(orient='records'),
+        'prediction': prediction.to_dict(orient='records'),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Train per-region models and run walk-forward backtests')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to model (repeatable). Defaults to all regions.')
+    parser.add_argument('--folds', type=int, default=5, help='Number of walk-forward folds.')
+    parser.add_argument('--test-size', type=int, default=DEFAULT_TEST_SIZE, help='Draws per test fold.')
+    parser.add_argument('--top-k', type=int, default=10, help='Numbers picked per draw.')
+    parser.add_argument('--jobs', type=int, default=-1, help='Parallel jobs for fold training (joblib n_jobs).')
+    parser.add_argument('--output', type=str, help='Write predictions and backtest metrics as JSON to this path.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    reports: List[Dict] = []
+    for region_code in args.region or list(REGIONS):
+        try:
+            reports.append(run_region(region_code, args.folds, args.test_size, args.top_k, args.jobs))
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"Skipping {region_code}: {e}")
+
+    for report in reports:
+        numbers = ', '.join(row['number'] for row in report['prediction'])
+        logger.info(f"{report['region']} top picks after {report['last_date']}: {numbers}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_files import atomic_write
+from .models.regions import REGIONS
+
+logger = logging.getLogger('vietnam-lottery')
+
+NUMBERS = [str(i) for i in range(100)]
+REGION_GROUP = 'ALL'
+
+# Per-number counters kept for every group; everything else is derived from these.
+STAT_FIELDS = (
+    'draws',           # draws observed
+    'appearances',     # draws in which the number appeared at least once
+    'current_gap',     # draws since the last appearance (all draws if never seen)
+    'max_gap',         # longest completed gap between two appearances
+    'gap_sum',         # sum of completed gaps, for the mean
+    'gap_count',       # number of completed gaps
+    'current_streak',  # consecutive draws with an appearance, ending at the last draw
+    'max_streak',      # longest run of consecutive draws with an appearance
+)
+
+
+def incidence_matrix(sparse_df: pd.DataFrame, province: Optional[str] = None) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Collapses sparse data (one row per date, or per date and province) into a
+    (draws x 100) count matrix ordered by date. When `province` is given only
+    that province's draws are kept, otherwise all provinces of a date are summed.
+    """
+    if sparse_df.empty:
+        return pd.DatetimeIndex([]), np.zeros((0, 100), dtype=np.int64)
+
+    df = sparse_df
+    if province is not None:
+        df = df[df['province'] == province]
+
+    counts = df.groupby('date', sort=True)[NUMBERS].sum()
+    return pd.DatetimeIndex(counts.index), counts.to_numpy(dtype=np.int64)
+
+
+def load_counts(region_code: str) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """Reads a region's sparse data (Parquet, or the CSV if there is none) as an incidence matrix."""
+    data_prefix = REGIONS[region_code].prefix
+    parquet_path = Path('data') / f'{data_prefix}-sparse.parquet'
+    if parquet_path.exists():
+        sparse = pd.read_parquet(parquet_path)
+    else:
+        sparse = pd.read_csv(Path('data') / f'{data_prefix}-sparse.csv', parse_dates=['date'])
+    return incidence_matrix(sparse)
+
+
+def run_lengths(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run-length encodes the True runs of every column of a 2-D boolean matrix.
+    Returns (column, start row, length) arrays, one entry per run.
+    """
+    n_rows, n_cols = mask.shape
+    padded = np.zeros((n_cols, n_rows + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask.T
+    edges = np.diff(padded, axis=1).ravel()
+
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    width = n_rows + 1
+    return starts // width, starts % width, ends - starts
+
+
+def draws_since_last(counts: np.ndarray) -> np.ndarray:
+    """
+    For every draw and number, the number of draws since the number last appeared
+    (0 if it appeared in that draw, draws so far if it has never appeared).
+    """
+    t = np.arange(counts.shape[0])
+    last_seen = np.maximum.accumulate(np.where(counts > 0, t[:, None], -1), axis=0)
+    return t[:, None] - last_seen
+
+
+def empty_gap_stats(n_numbers: int = 100) -> Dict[str, np.ndarray]:
+    return {field: np.zeros(n_numbers, dtype=np.int64) for field in STAT_FIELDS}
+
+
+def update_gap_stats(state: Dict[str, np.ndarray], hits: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Folds a block of new draws (draws x numbers boolean matrix, chronological)
+    into existing gap/streak counters and returns the updated counters.
+    Computing from scratch is just folding the full history into empty counters.
+    """
+    hits = np.asarray(hits, dtype=bool)
+    m, n = hits.shape
+    if m == 0:
+        return state
+
+    new = {field: values.copy() for field, values in state.items()}
+
+    hit_cols, hit_starts, hit_lens = run_lengths(hits)
+    miss_cols, miss_starts, miss_lens = run_lengths(~hits)
+    hit_ends = hit_starts + hit_lens
+    miss_ends = miss_starts + miss_lens
+
+    def per_column(cols: np.ndarray, values: np.ndarray, select: np.ndarray) -> np.ndarray:
+        out = np.zeros(n, dtype=np.int64)
+        np.maximum.at(out, cols[select], values[select])
+        return out
+
+    leading_hit = per_column(hit_cols, hit_lens, hit_starts == 0)
+    trailing_hit = per_column(hit_cols, hit_lens, hit_ends == m)
+    leading_miss = per_column(miss_cols, miss_lens, miss_starts == 0)
+    trailing_miss = per_column(miss_cols, miss_lens, miss_ends == m)
+    block_max_streak = per_column(hit_cols, hit_lens, np.ones_like(hit_cols, dtype=bool))
+
+    block_hits = hits.sum(axis=0)
+    all_hit = block_hits == m
+    all_miss = block_hits == 0
+    seen_before = state['appearances'] > 0
+
+    # Streaks: the streak running at the end of the old block continues into the new one.
+    joined_streak = state['current_streak'] + leading_hit
+    new['max_streak'] = np.maximum.reduce([state['max_streak'], block_max_streak, joined_streak])
+    new['current_streak'] = np.where(all_hit, state['current_streak'] + m, trailing_hit)
+
+    # Gaps strictly inside the block are bounded by appearances on both sides.
+    inner = (miss_starts > 0) & (miss_ends < m)
+    inner_sum = np.bincount(miss_cols[inner], weights=miss_lens[inner], minlength=n).astype(np.int64)
+    inner_count = np.bincount(miss_cols[inner], minlength=n).astype(np.int64)
+    inner_max = per_column(miss_cols, miss_lens, inner)
+
+    # The gap carried over from the previous block closes at the first appearance in this one,
+    # unless it is the censored stretch before the number was ever seen.
+    carried = state['current_gap'] + leading_miss
+    closes = seen_before & ~all_miss & (carried > 0)
+    closed = np.where(closes, carried, 0)
+
+    new['gap_sum'] = state['gap_sum'] + inner_sum + closed
+    new['gap_count'] = state['gap_count'] + inner_count + closes.astype(np.int64)
+    new['max_gap'] = np.maximum.reduce([state['max_gap'], inner_max, closed])
+    new['current_gap'] = np.where(all_miss, state['current_gap'] + m, trailing_miss)
+
+    new['draws'] = state['draws'] + m
+    new['appearances'] = state['appearances'] + block_hits
+    return new
+
+
+def compute_gap_stats(hits: np.ndarray) -> Dict[str, np.ndarray]:
+    hits = np.asarray(hits, dtype=bool)
+    return update_gap_stats(empty_gap_stats(hits.shape[1]), hits)
+
+
+def gap_stats_frame(state: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Turns raw counters into a per-number table with derived mean and max gap."""
+    df = pd.DataFrame({field: state[field] for field in STAT_FIELDS})
+    df.insert(0, 'number', [str(i).zfill(2) for i in range(len(df))])
+
+    # An ongoing gap counts towards the record once the number has been seen at least once.
+    ongoing = np.where(df['appearances'] > 0, df['current_gap'], 0)
+    df['max_gap'] = np.maximum(df['max_gap'], ongoing)
+    df['mean_gap'] = (df['gap_sum'] / df['gap_count'].replace(0, np.nan)).round(2)
+    return df.drop(columns=['gap_sum', 'gap_count'])
+
+
+def history_fingerprint(dates: pd.DatetimeIndex, counts: np.ndarray) -> str:
+    """Hash of the dates and counts of a history, to tell whether draws already summarized changed."""
+    digest = hashlib.sha256()
+    digest.update(dates.values.astype('datetime64[D]').astype(np.int64).tobytes())
+    digest.update(np.ascontiguousarray(counts, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class GapStatsCache:
+    """
+    Per-number gap and streak statistics for a region and each of its provinces,
+    persisted to data/<prefix>-gap-stats.json and updated with only the draws
+    that are newer than the cached watermark. Each group also stores a
+    fingerprint of the draws it summarizes, so corrected or backfilled draws
+    behind the watermark trigger a rebuild.
+    """
+
+    def __init__(self, data_prefix: str) -> None:
+        self._data_prefix = data_prefix
+        self._file_path = Path('data') / f'{data_prefix}-gap-stats.json'
+        self._groups: Dict[str, Dict] = {}
+        self._loaded = False
+
+    def load(self) -> None:
+        self._loaded = True
+        if not self._file_path.exists():
+            return
+        try:
+            with open(self._file_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._groups = {
+                group: {
+                    'last_date': pd.Timestamp(entry['last_date']),
+                    'fingerprint': entry.get('fingerprint'),
+                    'stats': {field: np.asarray(entry['stats'][field], dtype=np.int64) for field in STAT_FIELDS},
+                }
+                for group, entry in raw.items()
+            }
+        except Exception as e:
+            logger.warning(f"Could not load gap stats cache {self._file_path}: {e}. Rebuilding.")
+            self._groups = {}
+
+    def dump(self) -> None:
+        raw = {
+            group: {
+                'last_date': entry['last_date'].date().isoformat(),
+                'fingerprint': entry['fingerprint'],
+                'stats': {field: entry['stats'][field].tolist() for field in STAT_FIELDS},
+            }
+            for group, entry in self._groups.items()
+        }
+        with atomic_write(self._file_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False)
+        logger.info(f"Saved gap stats for {len(raw)} groups to {self._file_path}")
+
+    def _update_group(self, group: str, dates: pd.DatetimeIndex, counts: np.ndarray) -> None:
+        if len(dates) == 0:
+            return
+
+        hits = counts > 0
+        entry = self._groups.get(group)
+        if entry is not None:
+            known = int(np.searchsorted(dates.values, entry['last_date'].to_datetime64(), side='right'))
+            if known != int(entry['stats']['draws'][0]) or entry['fingerprint'] != history_fingerprint(dates[:known], counts[:known]):
+                # History changed behind the watermark (backfill or correction): start over.
+                logger.info(f"Gap stats for {self._data_prefix}/{group} are stale. Rebuilding.")
+                entry = None
+
+        if entry is None:
+            stats = compute_gap_stats(hits)
+        else:
+            stats = update_gap_stats(entry['stats'], hits[known:])
+
+        self._groups[group] = {'last_date': dates[-1], 'fingerprint': history_fingerprint(dates, counts), 'stats': stats}
+
+    def update(self, sparse_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Brings the cache up to date with `sparse_df`, saves it and returns the stats
+        table. The file is only read on the first update, so a long-lived cache
+        (as kept by the fetch daemon) updates from memory.
+        """
+        if not self._loaded:
+            self.load()
+
+        self._update_group(REGION_GROUP, *incidence_matrix(sparse_df))
+        if 'province' in sparse_df.columns:
+            for province in sorted(sparse_df['province'].unique()):
+                self._update_group(province, *incidence_matrix(sparse_df, province))
+
+        if self._groups:
+            self.dump()
+        return self.to_frame()
+
+    def to_frame(self) -> pd.DataFrame:
+        frames: List[pd.DataFrame] = []
+        for group, entry in self._groups.items():
+            df = gap_stats_frame(entry['stats'])
+            df.insert(0, 'group', group)
+            df.insert(1, 'last_date', entry['last_date'])
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
@@ -1,21 +1,22 @@
 import logging
 from copy import copy
 from datetime import date
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
 
 from .lottery_base import LotteryBase
+from .metrics import metrics
 from .models.lottery_mb import ResultMB, ResultMBList
+from .models.regions import REGIONS
 
 logger = logging.getLogger('vietnam-lottery')
 
 
 class LotteryMB(LotteryBase):
-    def __init__(self) -> None:
-        super().__init__('xsmb', ResultMB, ResultMBList)
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        super().__init__(REGIONS['MB'].prefix, ResultMB, ResultMBList, base_url)
 
     def _safe_int_conversion(self, value: str) -> int:
         try:
@@ -24,18 +25,18 @@ class LotteryMB(LotteryBase):
             return 0 # Return 0 if conversion fails (e.g., for '...')
 
     def fetch(self, selected_date: date) -> ResultMB | None:
-        url = f'https://xoso.com.vn/xsmb-{selected_date:%d-%m-%Y}.html'
+        url = self._page_url(selected_date)
         logger.info(f"Fetching URL: {url}")
         
         try:
-            resp = self._http.get(url)
+            resp = self._get(url)
             logger.info(f"Response status: {resp.status_code}")
             
             if resp.status_code != 200:
                 logger.error(f"Failed to fetch URL {url}, status code: {resp.status_code}")
                 return None
 
-            soup = BeautifulSoup(resp.text, 'lxml')
+            soup = self._parse_page(resp.text)
             table = soup.find('table', class_='table-result')
             
             if not table:
@@ -54,6 +55,7 @@ class LotteryMB(LotteryBase):
                 numbers = cells[1].get_text(strip=True)
                 
                 if '...' in numbers:
+                    metrics.incr('incomplete_pages', region=self._data_prefix)
                     logger.warning(f"Skipping XSMB for {selected_date} due to incomplete data: {numbers}")
                     return None # Return None to signal incomplete data for the day
 
@@ -87,7 +89,7 @@ class LotteryMB(LotteryBase):
                         prizes[f'prize7_{i}'] = num
 
             # Create ResultMB object
-            result = ResultMB(
+            result = self._build_result(
                 date=selected_date,
                 special=prizes['special'],
                 prize1=prizes['prize1'],
@@ -97,7 +99,7 @@ class LotteryMB(LotteryBase):
                 prize3_2=prizes['prize3_2'],
                 prize3_3=prizes['prize3_3'],
                 prize3_4=prizes['prize3_4'],
-                prize3_5=prizes['prize3_3'], # Corrected from prize3_5 to prize3_3
+                prize3_5=prizes['prize3_5'],
                 prize3_6=prizes['prize3_6'],
                 prize4_1=prizes['prize4_1'],
                 prize4_2=prizes['prize4_2'],
@@ -118,7 +120,7 @@ class LotteryMB(LotteryBase):
                 prize7_4=prizes['prize7_4']
             )
             
-            self._data[result.date] = result # Update internal data store
+            self._store_result(result.date, result) # Update internal data store
             logger.info(f"Successfully fetched data for {selected_date}")
             return result
             
@@ -126,6 +128,7 @@ class LotteryMB(LotteryBase):
             logger.error(f"Error fetching data for {selected_date}: {e}")
             return None
 
+    @metrics.timed('generate_dataframes')
     def generate_dataframes(self) -> None:
         if not self._data:
             logger.info("No data to generate dataframes")
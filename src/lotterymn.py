@@ -1,21 +1,23 @@
 import logging
 from copy import copy
 from datetime import date
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
 
 from .lottery_base import LotteryMultiProvinceBase
+from .metrics import metrics
 from .models.lottery_mn import ResultMN, ResultMNList
+from .models.regions import REGIONS
 
 logger = logging.getLogger('vietnam-lottery')
 
 
 class LotteryMN(LotteryMultiProvinceBase):
-    def __init__(self) -> None:
-        super().__init__('xsmn', ResultMN, ResultMNList)
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        super().__init__(REGIONS['MN'].prefix, ResultMN, ResultMNList, base_url)
 
     def _create_result_model(self, selected_date: date, province: str, prizes: Dict[str, List[int]]) -> ResultMN:
         return ResultMN(
@@ -41,6 +43,7 @@ class LotteryMN(LotteryMultiProvinceBase):
             prize8=prizes.get('8', [0])[0]
         )
 
+    @metrics.timed('generate_dataframes')
     def generate_dataframes(self) -> None:
         if not self._data:
             logger.info("No data to generate dataframes")
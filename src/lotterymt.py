@@ -1,14 +1,16 @@
 import logging
 from copy import copy
 from datetime import date
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 
 from .lottery_base import LotteryMultiProvinceBase
+from .metrics import metrics
 from .models.lottery_mt import ResultMT, ResultMTList
+from .models.regions import REGIONS
 
 logger = logging.getLogger('vietnam-lottery')
 
@@ -22,8 +24,8 @@ class ResultMTList(BaseModel):
 
 
 class LotteryMT(LotteryMultiProvinceBase):
-    def __init__(self) -> None:
-        super().__init__('xsmt', ResultMT, ResultMTList)
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        super().__init__(REGIONS['MT'].prefix, ResultMT, ResultMTList, base_url)
 
     def _create_result_model(self, selected_date: date, province: str, prizes: Dict[str, List[int]]) -> ResultMT:
         return ResultMT(
@@ -49,6 +51,7 @@ class LotteryMT(LotteryMultiProvinceBase):
             prize8=prizes.get('8', [0])[0]
         )
 
+    @metrics.timed('generate_dataframes')
     def generate_dataframes(self) -> None:
         if not self._data:
             logger.info("No data to generate dataframes")
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import logging
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .data_files import atomic_write
+
+logger = logging.getLogger('vietnam-lottery')
+
+# Bump whenever the layout of the data files or of the manifest itself changes
+SCHEMA_VERSION = 1
+
+
+def manifest_path(data_prefix: str) -> Path:
+    return Path('data') / f'{data_prefix}-manifest.json'
+
+
+def file_entry(file_path: Path, rows: int) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'rows': rows, 'bytes': file_path.stat().st_size, 'sha256': digest.hexdigest()}
+
+
+def build_manifest(data_prefix: str, dates: Iterable[date], results: int, provinces: Iterable[str],
+                   files: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    dates = sorted(set(dates))
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'region': data_prefix,
+        'first_date': dates[0].isoformat() if dates else None,
+        'last_date': dates[-1].isoformat() if dates else None,
+        'dates': len(dates),
+        'results': results,
+        'provinces': sorted(set(provinces)),
+        'files': files,
+        'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def write_manifest(data_prefix: str, manifest: Dict[str, Any]) -> None:
+    """Writes the manifest to a temporary file and renames it, so readers never see a partial file."""
+    file_path = manifest_path(data_prefix)
+    with atomic_write(file_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    logger.info(f"Saved manifest to {file_path}")
+
+
+def read_manifest(data_prefix: str) -> Optional[Dict[str, Any]]:
+    """Returns the region's manifest, or None if it is missing, unreadable or of another schema version."""
+    file_path = manifest_path(data_prefix)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f"Could not read manifest {file_path}: {e}")
+        return None
+
+    if manifest.get('schema_version') != SCHEMA_VERSION:
+        logger.warning(f"Ignoring manifest {file_path} with schema version {manifest.get('schema_version')}")
+        return None
+    return manifest
+
+
+def manifest_last_date(data_prefix: str) -> Optional[date]:
+    manifest = read_manifest(data_prefix)
+    if manifest and manifest.get('last_date'):
+        return date.fromisoformat(manifest['last_date'])
+    return None
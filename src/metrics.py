@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger('vietnam-lottery')
+
+# Kept to the standard library: src.fetch imports this before it knows whether there is anything to fetch.
+DEFAULT_METRICS_DIR = 'metrics'
+
+COUNTER_HELP = {
+    'http_requests': 'Requests sent to the results site, by status code.',
+    'http_bytes_downloaded': 'Bytes of response bodies downloaded from the results site.',
+    'incomplete_pages': 'Result pages that still showed ... for some prizes.',
+    'fetch_retries': 'Times an incomplete day was scheduled for another fetch.',
+    'rows_processed': 'Rows handled by a stage.',
+    'bytes_written': 'Bytes written to data files.',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escape = lambda v: v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels) + '}'
+
+
+class Metrics:
+    """
+    Process-wide stage timers and counters. Stages are timed with
+    `metrics.timer('dump', region='xsmn')` or the `metrics.timed('stage')`
+    method decorator; write() exports a JSON run report and a Prometheus
+    text-format file for node_exporter's textfile collector.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock() # Fetchers may run on several threads (benchmarks/load_test.py)
+        self.reset()
+
+    def reset(self) -> None:
+        self._started_at = time.time()
+        self._timers: Dict[Key, List[float]] = {} # [count, total seconds, max seconds]
+        self._counters: Dict[Key, float] = {}
+
+    def observe(self, stage: str, seconds: float, **labels: Any) -> None:
+        key = _key(stage, labels)
+        with self._lock:
+            timer = self._timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, stage: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def timed(self, stage: str) -> Callable:
+        """Decorates a LotteryBase method so every call is timed, labelled with the instance's data prefix."""
+        def decorator(method: Callable) -> Callable:
+            @wraps(method)
+            def wrapper(instance, *args, **kwargs):
+                with self.timer(stage, region=getattr(instance, '_data_prefix', None)):
+                    return method(instance, *args, **kwargs)
+            return wrapper
+        return decorator
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        return {
+            'timers': [
+                {'stage': stage, 'labels': dict(labels), 'count': int(count), 'seconds': total, 'max_seconds': longest}
+                for (stage, labels), (count, total, longest) in sorted(self._timers.items())
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ],
+        }
+
+    def merge(self, snapshot: Dict[str, List[Dict]]) -> None:
+        """Adds a snapshot taken in another process (e.g. a pool worker) to this one."""
+        for timer in snapshot['timers']:
+            current = self._timers.setdefault(_key(timer['stage'], timer['labels']), [0, 0.0, 0.0])
+            current[0] += timer['count']
+            current[1] += timer['seconds']
+            current[2] = max(current[2], timer['max_seconds'])
+        for counter in snapshot['counters']:
+            self.incr(counter['name'], counter['value'], **counter['labels'])
+
+    def report(self, job: str) -> Dict[str, Any]:
+        finished_at = time.time()
+        return {
+            'job': job,
+            'started_at': datetime.fromtimestamp(self._started_at, timezone.utc).isoformat(timespec='seconds'),
+            'finished_at': datetime.fromtimestamp(finished_at, timezone.utc).isoformat(timespec='seconds'),
+            'duration_seconds': finished_at - self._started_at,
+            **self.snapshot(),
+        }
+
+    def to_prometheus(self, job: str) -> str:
+        job_label = (('command', job),) # Not 'job', which Prometheus sets itself when scraping
+        lines = [
+            '# HELP lottery_run_duration_seconds Wall time of the last run.',
+            '# TYPE lottery_run_duration_seconds gauge',
+            f'lottery_run_duration_seconds{_format_labels(job_label)} {time.time() - self._started_at:.6f}',
+            '# HELP lottery_run_timestamp_seconds Unix time the last run finished.',
+            '# TYPE lottery_run_timestamp_seconds gauge',
+            f'lottery_run_timestamp_seconds{_format_labels(job_label)} {time.time():.0f}',
+            '# HELP lottery_stage_duration_seconds Time spent per stage in the last run.',
+            '# TYPE lottery_stage_duration_seconds summary',
+        ]
+        for (stage, labels), (count, total, _) in sorted(self._timers.items()):
+            label_text = _format_labels(job_label + (('stage', stage),) + labels)
+            lines.append(f'lottery_stage_duration_seconds_sum{label_text} {total:.6f}')
+            lines.append(f'lottery_stage_duration_seconds_count{label_text} {int(count)}')
+        lines += [
+            '# HELP lottery_stage_duration_max_seconds Longest single call per stage in the last run.',
+            '# TYPE lottery_stage_duration_max_seconds gauge',
+        ]
+        for (stage, labels), (_, _, longest) in sorted(self._timers.items()):
+            lines.append(f'lottery_stage_duration_max_seconds{_format_labels(job_label + (("stage", stage),) + labels)} {longest:.6f}')
+
+        for name in sorted({name for name, _ in self._counters}):
+            lines.append(f'# HELP lottery_{name}_total {COUNTER_HELP.get(name, name)}')
+            lines.append(f'# TYPE lottery_{name}_total counter')
+            for (counter_name, labels), value in sorted(self._counters.items()):
+                if counter_name == name:
+                    lines.append(f'lottery_{name}_total{_format_labels(job_label + labels)} {int(value) if float(value).is_integer() else value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, metrics_dir: Path, job: str) -> None:
+        """
+        Writes <job>-report.json and <job>.prom (replaced atomically on every
+        run) and appends the report to <job>-runs.ndjson, which keeps the history
+        that lottery.log loses on each run.
+        """
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        report = self.report(job)
+        for file_name, content in (
+            (f'{job}-report.json', json.dumps(report, indent=2)),
+            (f'{job}.prom', self.to_prometheus(job)),
+        ):
+            file_path = metrics_dir / file_name
+            tmp_path = file_path.with_name(file_path.name + '.tmp')
+            tmp_path.write_text(content, encoding='utf-8')
+            os.replace(tmp_path, file_path)
+        with open(metrics_dir / f'{job}-runs.ndjson', 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + '\n')
+        logger.info(f"Saved {job} metrics to {metrics_dir}")
+
+
+metrics = Metrics()
@@ -2,6 +2,11 @@ from datetime import date
 from typing import List
 from pydantic import BaseModel
 
+# Số chữ số của mỗi giải, từ giải đặc biệt đến giải thấp nhất
+# (các trường prizeN_i thuộc giải prizeN)
+PRIZE_DIGITS = {'special': 5, 'prize1': 5, 'prize2': 5, 'prize3': 5, 'prize4': 4, 'prize5': 4, 'prize6': 3, 'prize7': 2}
+
+
 class ResultMB(BaseModel):
     """Kết quả xổ số miền Bắc"""
     date: date
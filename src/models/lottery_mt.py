@@ -2,6 +2,11 @@ from datetime import date
 from typing import List
 from pydantic import BaseModel
 
+# Số chữ số của mỗi giải, từ giải đặc biệt đến giải thấp nhất
+# (các trường prizeN_i thuộc giải prizeN)
+PRIZE_DIGITS = {'special': 6, 'prize1': 5, 'prize2': 5, 'prize3': 5, 'prize4': 5, 'prize5': 4, 'prize6': 4, 'prize7': 3, 'prize8': 2}
+
+
 class ResultMT(BaseModel):
     """Kết quả xổ số miền Trung"""
     date: date
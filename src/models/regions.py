@@ -0,0 +1,47 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, Type
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+# Kept free of heavy imports at module level: src.fetch and src.query read the registry
+# before they know whether pandas or the result models are needed at all.
+
+
+class Region:
+    """
+    One lottery region: its code (MB), the file prefix of its data files (xsmb),
+    and the result model and prize widths in src/models/lottery_<code>.py, which
+    are only imported when first used.
+    """
+
+    def __init__(self, code: str, prefix: str, module: str, model_name: str) -> None:
+        self.code = code
+        self.prefix = prefix
+        self._module = module
+        self._model_name = model_name
+
+    @property
+    def name(self) -> str:
+        """Name used in logs and fetch summaries, e.g. XSMB."""
+        return self.prefix.upper()
+
+    @property
+    def result_model(self) -> Type['BaseModel']:
+        return getattr(import_module(f'.{self._module}', __package__), self._model_name)
+
+    @property
+    def prize_digits(self) -> Dict[str, int]:
+        return import_module(f'.{self._module}', __package__).PRIZE_DIGITS
+
+    def __repr__(self) -> str:
+        return f'Region({self.code!r}, {self.prefix!r})'
+
+
+REGIONS: Dict[str, Region] = {
+    'MB': Region('MB', 'xsmb', 'lottery_mb', 'ResultMB'),
+    'MN': Region('MN', 'xsmn', 'lottery_mn', 'ResultMN'),
+    'MT': Region('MT', 'xsmt', 'lottery_mt', 'ResultMT'),
+}
+
+PREFIX_REGIONS: Dict[str, Region] = {region.prefix: region for region in REGIONS.values()}
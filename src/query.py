@@ -0,0 +1,122 @@
+import argparse
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from .data_files import csv_rows_for_date, latest_csv_date, latest_csv_rows, read_header
+from .manifest import read_manifest
+from .models.regions import REGIONS # Standard library only, like everything here: this CLI must start in well under 100 ms
+
+
+def _csv_path(region_code: str) -> Path:
+    return Path('data') / f'{REGIONS[region_code].prefix}.csv'
+
+
+def _records(region_code: str, rows: List[List[str]]) -> List[Dict]:
+    header = read_header(_csv_path(region_code))
+    records = []
+    for row in rows:
+        record: Dict = {'region': region_code}
+        for column, value in zip(header, row):
+            record[column] = value[:10] if column == 'date' else (value if column == 'province' else int(value))
+        records.append(record)
+    return records
+
+
+def _print_records(records: List[Dict], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(records, indent=2, ensure_ascii=False))
+        return
+    for record in records:
+        place = record.get('province', record['region'])
+        prizes = ' '.join(f'{k}={v}' for k, v in record.items() if k not in ('region', 'date', 'province'))
+        print(f"{record['date']} {place}: {prizes}")
+
+
+def cmd_latest(args: argparse.Namespace) -> int:
+    records = []
+    for region_code in args.region or list(REGIONS):
+        records.extend(_records(region_code, latest_csv_rows(_csv_path(region_code))))
+    _print_records(records, args.json)
+    return 0
+
+
+def cmd_show(args: argparse.Namespace) -> int:
+    records = []
+    for region_code in args.region or list(REGIONS):
+        records.extend(_records(region_code, csv_rows_for_date(_csv_path(region_code), args.date)))
+    if not records:
+        print(f"No results for {args.date}", file=sys.stderr)
+        return 1
+    _print_records(records, args.json)
+    return 0
+
+
+def cmd_status(args: argparse.Namespace) -> int:
+    today = datetime.now(ZoneInfo('Asia/Ho_Chi_Minh')).date()
+    statuses = []
+    for region_code in args.region or list(REGIONS):
+        manifest = read_manifest(REGIONS[region_code].prefix)
+        if manifest is not None:
+            last_date = date.fromisoformat(manifest['last_date']) if manifest['last_date'] else None
+            status = {
+                'region': region_code,
+                'last_date': manifest['last_date'],
+                'results': manifest['results'],
+                'provinces': len(manifest['provinces']),
+                'updated': manifest['updated_at'],
+            }
+        else:
+            # No manifest yet: fall back to the tail of the CSV
+            csv_path = _csv_path(region_code)
+            try:
+                last_date = latest_csv_date(csv_path)
+                updated: Optional[str] = datetime.fromtimestamp(csv_path.stat().st_mtime).isoformat(timespec='seconds')
+            except FileNotFoundError:
+                last_date, updated = None, None
+            status = {
+                'region': region_code,
+                'last_date': last_date.isoformat() if last_date else None,
+                'results': None,
+                'provinces': None,
+                'updated': updated,
+            }
+        status['days_behind'] = (today - last_date).days if last_date else None
+        status['stale'] = status['days_behind'] is None or (args.max_days_behind is not None and status['days_behind'] > args.max_days_behind)
+        statuses.append(status)
+
+    if args.json:
+        print(json.dumps(statuses, indent=2))
+    else:
+        for status in statuses:
+            print(f"{status['region']}: last date {status['last_date']}, {status['days_behind']} day(s) behind, updated {status['updated']}")
+
+    # A non-zero exit code lets schedulers and monitoring alert on stale regions
+    return 1 if args.max_days_behind is not None and any(s['stale'] for s in statuses) else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to query (repeatable). Defaults to all regions.')
+    common.add_argument('--json', action='store_true', help='Print JSON instead of text.')
+
+    parser = argparse.ArgumentParser(description='Query stored lottery results')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('latest', parents=[common], help='Show the most recent results.').set_defaults(func=cmd_latest)
+    show = subparsers.add_parser('show', parents=[common], help='Show the results of a date.')
+    show.add_argument('date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), help='Date in format YYYY-MM-DD.')
+    show.set_defaults(func=cmd_show)
+    status = subparsers.add_parser('status', parents=[common], help='Show how fresh the stored data is.')
+    status.add_argument('--max-days-behind', type=int, help='Exit with status 1 if a region is more than this many days behind.')
+    status.set_defaults(func=cmd_status)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import argparse
+import bisect
+import json
+import logging
+import threading
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from .models.regions import REGIONS
+from .suffix_index import SuffixIndex
+from .ticket_checker import prize_fields
+
+logger = logging.getLogger('vietnam-lottery')
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+Response = Tuple[int, bytes]
+
+
+class NotFound(Exception):
+    pass
+
+
+class RegionSnapshot:
+    """
+    Immutable in-memory view of one region's results with date, province,
+    suffix and cumulative frequency indexes. A reload builds a new snapshot
+    and swaps it in, so readers never see a half-built index.
+    """
+
+    def __init__(self, region_code: str, records: List[Dict], mtime: float) -> None:
+        self.region_code = region_code
+        self.mtime = mtime
+        region = REGIONS[region_code]
+        fields = [field for field, _, _ in prize_fields(region.result_model, region.prize_digits)]
+
+        records = sorted(records, key=lambda r: r['date'])
+        self.by_date: Dict[str, List[Dict]] = {}
+        self.by_province: Dict[str, List[Dict]] = {}
+        for record in records:
+            self.by_date.setdefault(record['date'], []).append(record)
+            if 'province' in record:
+                self.by_province.setdefault(record['province'], []).append(record)
+        self.dates = sorted(self.by_date)
+
+        # Cumulative 2-digit counts per date: any date range is one subtraction away
+        counts = np.zeros((len(self.dates) + 1, 100), dtype=np.int64)
+        for i, day in enumerate(self.dates, 1):
+            numbers = [record[field] % 100 for record in self.by_date[day] for field in fields]
+            counts[i] = np.bincount(numbers, minlength=100)
+        self.cumulative_counts = np.cumsum(counts, axis=0)
+
+        self.suffix_index = SuffixIndex(region_code)
+        self.suffix_index.update(records)
+
+    def date_slice(self, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self.dates, start) if start else 0
+        hi = bisect.bisect_right(self.dates, end) if end else len(self.dates)
+        return lo, max(lo, hi)
+
+
+class Generation:
+    """
+    The snapshots of every region at one point in time. Hashed by identity, so
+    cached responses are keyed on the generation they were computed from.
+    """
+
+    def __init__(self, snapshots: Dict[str, RegionSnapshot]) -> None:
+        self.snapshots = snapshots
+
+
+class QueryService:
+    def __init__(self, regions: Sequence[str], cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self._regions = list(regions)
+        self._generation = Generation({})
+        self._reload_lock = threading.Lock()
+        self._cached_handle = lru_cache(maxsize=cache_size)(self._handle)
+
+    def handle(self, path: str, query: str) -> Response:
+        # A request still running against an older generation can only cache its
+        # response under that generation, which no later request asks for.
+        return self._cached_handle(self._generation, path, query)
+
+    def _json_path(self, region_code: str) -> Path:
+        return Path('data') / f'{REGIONS[region_code].prefix}.json'
+
+    def reload(self, force: bool = False) -> bool:
+        """Reloads every region whose JSON file changed. Returns True if anything was reloaded."""
+        reloaded = False
+        with self._reload_lock:
+            snapshots = dict(self._generation.snapshots)
+            for region_code in self._regions:
+                file_path = self._json_path(region_code)
+                try:
+                    mtime = file_path.stat().st_mtime
+                    current = snapshots.get(region_code)
+                    if not force and current is not None and current.mtime == mtime:
+                        continue
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        records = json.load(f)
+                    snapshots[region_code] = RegionSnapshot(region_code, records, mtime)
+                    reloaded = True
+                    logger.info(f"Loaded {len(records)} {region_code} results from {file_path}")
+                except FileNotFoundError:
+                    logger.warning(f"Data file {file_path} does not exist. Skipping {region_code}.")
+                except ValueError as e:
+                    # Most likely caught the file mid-write; the next poll picks it up
+                    logger.warning(f"Could not load {file_path}: {e}")
+            if reloaded:
+                self._generation = Generation(snapshots)
+                self._cached_handle.cache_clear() # Only frees memory; old entries can no longer be hit
+        return reloaded
+
+    def watch(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> threading.Event:
+        """Polls the data files in a background thread. Set the returned event to stop."""
+        def poll() -> None:
+            while not stop.wait(interval):
+                self.reload()
+
+        stop = threading.Event()
+        threading.Thread(target=poll, name='data-reloader', daemon=True).start()
+        return stop
+
+    def _handle(self, generation: Generation, path: str, query: str) -> Response:
+        try:
+            body = self._route(generation, [unquote(p) for p in path.strip('/').split('/') if p], parse_qs(query))
+            return 200, json.dumps(body, ensure_ascii=False).encode('utf-8')
+        except NotFound as e:
+            return 404, json.dumps({'error': str(e)}).encode('utf-8')
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}).encode('utf-8')
+
+    def _route(self, generation: Generation, parts: List[str], params: Dict[str, List[str]]):
+        param = lambda name: params.get(name, [None])[0]
+
+        def count_param(name: str, default: int) -> int:
+            value = int(param(name) or default)
+            if value < 0:
+                raise ValueError(f"{name} must not be negative")
+            return value
+
+        def date_param(name: str) -> Optional[str]:
+            value = param(name)
+            return date.fromisoformat(value).isoformat() if value else None
+
+        if not parts or parts == ['regions']:
+            return [
+                {'region': code, 'first_date': s.dates[0] if s.dates else None,
+                 'last_date': s.dates[-1] if s.dates else None, 'dates': len(s.dates),
+                 'provinces': sorted(s.by_province)}
+                for code, s in generation.snapshots.items()
+            ]
+
+        snapshot = generation.snapshots.get(parts[0].upper())
+        if snapshot is None:
+            raise NotFound(f"Unknown region: {parts[0]}")
+        resource, args = (parts[1], parts[2:]) if len(parts) > 1 else ('latest', [])
+
+        if resource == 'latest' and not args:
+            return snapshot.by_date[snapshot.dates[-1]] if snapshot.dates else []
+
+        if resource == 'dates' and len(args) == 1:
+            day = date.fromisoformat(args[0]).isoformat()
+            if day not in snapshot.by_date:
+                raise NotFound(f"No {snapshot.region_code} results for {day}")
+            return snapshot.by_date[day]
+
+        if resource == 'provinces' and not args:
+            return sorted(snapshot.by_province)
+
+        if resource == 'provinces' and len(args) == 1:
+            records = snapshot.by_province.get(args[0])
+            if records is None:
+                raise NotFound(f"Unknown province: {args[0]}")
+            start, end = date_param('start'), date_param('end')
+            records = [r for r in records if (not start or r['date'] >= start) and (not end or r['date'] <= end)]
+            limit = count_param('limit', 0)
+            return records[-limit:] if limit else records
+
+        if resource == 'numbers' and len(args) == 1:
+            return [
+                {'date': day.isoformat(), 'province': province or None, 'prize': field}
+                for day, province, field in snapshot.suffix_index.lookup(args[0])
+            ]
+
+        if resource == 'frequency' and not args:
+            lo, hi = snapshot.date_slice(date_param('start'), date_param('end'))
+            counts = snapshot.cumulative_counts[hi] - snapshot.cumulative_counts[lo]
+            order = np.argsort(-counts, kind='stable')[:count_param('top', 100)]
+            return {
+                'start': snapshot.dates[lo] if hi > lo else None,
+                'end': snapshot.dates[hi - 1] if hi > lo else None,
+                'dates': hi - lo,
+                'frequency': {str(n).zfill(2): int(counts[n]) for n in order},
+            }
+
+        raise NotFound(f"Unknown path: /{'/'.join(parts)}")
+
+
+def make_handler(service: QueryService):
+    class QueryHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1' # Keep-alive, so clients are not paying for a connection per request
+        disable_nagle_algorithm = True # Headers and body go out as separate writes
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            status, body = service.handle(url.path, url.query)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format % args)
+
+    return QueryHandler
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Serve lottery results as JSON over HTTP')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to bind.')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on.')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to serve (repeatable). Defaults to all regions.')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help='Number of responses kept in the LRU cache.')
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL, help='Seconds between checks for new data.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    service = QueryService(args.region or list(REGIONS), args.cache_size)
+    service.reload(force=True)
+    service.watch(args.reload_interval)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    logger.info(f"Serving lottery data on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
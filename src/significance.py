@@ -0,0 +1,305 @@
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .lottery_stats import NUMBERS, draws_since_last, load_counts
+from .metrics import DEFAULT_METRICS_DIR, metrics
+from .models.regions import REGIONS
+from .ticket_checker import prize_fields
+
+logger = logging.getLogger('vietnam-lottery')
+
+DEFAULT_SIMULATIONS = 10000
+DEFAULT_SEED = 0
+DEFAULT_TOP_PAIRS = 20
+DEFAULT_ALPHA = 0.05
+
+# Simulations per pool task. Fixed, so that a seed gives the same p-values for any number of workers.
+SIMULATIONS_PER_TASK = 250
+# Upper bound on simulations x draws x numbers held in memory at once inside a task
+BATCH_CELLS = 20_000_000
+# Peak memory per cell of a batch (counts, hits, gaps and their temporaries), about 600 MB at BATCH_CELLS
+BYTES_PER_CELL = 32
+
+PAIRS = np.triu_indices(100, k=1)
+TALLIED = ('count', 'max_gap', 'current_gap', 'pair')
+
+
+def slots_per_draw(region_code: str, counts: np.ndarray) -> np.ndarray:
+    """
+    Prize numbers drawn on each date, as observed (18 per MN/MT province, 27 for MB).
+    Every prize is at least two digits wide, so under the null hypothesis its last
+    two digits are uniform over 00-99 and can be drawn directly.
+    """
+    region = REGIONS[region_code]
+    fields = prize_fields(region.result_model, region.prize_digits)
+    narrow = [field for field, _, digits in fields if digits < 2]
+    if narrow:
+        raise ValueError(f"Prizes {narrow} of {region_code} have fewer than two digits")
+
+    slots = counts.sum(axis=1)
+    if np.any(slots % len(fields)):
+        logger.warning(f"Some {region_code} draws do not have a multiple of {len(fields)} prize numbers")
+    return slots
+
+
+def draw_statistics(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Test statistics of a (draws x simulations x 100) count array, one row of
+    (simulations x 100) results per statistic: per-number occurrences, longest and
+    current gap (in draws, as in the gap stats), draws shared by every pair of
+    numbers, and the chi-square statistic of the occurrences.
+    """
+    n_draws, n_sims, n_numbers = counts.shape
+    hits = counts > 0
+
+    occurrences = counts.sum(axis=0)
+    expected = occurrences.sum(axis=1, keepdims=True) / n_numbers
+
+    # Simulations side by side as extra columns; never-seen numbers have since == t + 1
+    since = draws_since_last(hits.reshape(n_draws, n_sims * n_numbers))
+    seen = since <= np.arange(n_draws)[:, None]
+    max_gap = np.where(seen, since, 0).max(axis=0)
+
+    together = hits.astype(np.float32)
+    together = np.matmul(together.transpose(1, 2, 0), together.transpose(1, 0, 2))
+
+    return {
+        'count': occurrences,
+        'max_gap': max_gap.reshape(n_sims, n_numbers),
+        'current_gap': since[-1].reshape(n_sims, n_numbers),
+        'pair': np.rint(together[:, PAIRS[0], PAIRS[1]]).astype(np.int64),
+        'chi2': ((occurrences - expected) ** 2 / expected).sum(axis=1),
+    }
+
+
+def _tally(statistics: Dict[str, np.ndarray], bounds: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """
+    Reduces simulated statistics to what the p-values need: a histogram pooled over
+    numbers (which are exchangeable under the null) and the per-simulation extremes.
+    """
+    tally = {'chi2': statistics['chi2']}
+    for name in TALLIED:
+        values = statistics[name]
+        tally[f'{name}_hist'] = np.bincount(values.ravel(), minlength=bounds[name] + 1)
+        tally[f'{name}_max'] = values.max(axis=1)
+        tally[f'{name}_min'] = values.min(axis=1)
+    return tally
+
+
+def _merge_tallies(tallies: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    merged = {}
+    for key in tallies[0]:
+        parts = [tally[key] for tally in tallies]
+        merged[key] = np.sum(parts, axis=0) if key.endswith('_hist') else np.concatenate(parts)
+    return merged
+
+
+def simulate(slots: np.ndarray, n_sims: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """
+    Simulates `n_sims` histories with `slots[t]` uniform two-digit numbers on draw t
+    and tallies their statistics. Runs in batches of at most BATCH_CELLS cells.
+    """
+    rng = np.random.default_rng(seed)
+    n_draws = len(slots)
+    total_slots = int(slots.sum())
+    draw_of_slot = np.repeat(np.arange(n_draws), slots)
+    bounds = {'count': total_slots, 'max_gap': n_draws, 'current_gap': n_draws, 'pair': n_draws}
+
+    batch = max(1, BATCH_CELLS // (n_draws * 100))
+    tallies = []
+    for start in range(0, n_sims, batch):
+        size = min(batch, n_sims - start)
+        numbers = rng.integers(0, 100, size=(size, total_slots), dtype=np.int64)
+        cells = (draw_of_slot * size + np.arange(size)[:, None]) * 100 + numbers
+        counts = np.bincount(cells.ravel(), minlength=n_draws * size * 100).reshape(n_draws, size, 100)
+        tallies.append(_tally(draw_statistics(counts), bounds))
+    return _merge_tallies(tallies)
+
+
+def _p_high(hist: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    at_least = np.cumsum(hist[::-1])[::-1]
+    return (1 + at_least[observed]) / (1 + hist.sum())
+
+
+def _p_low(hist: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    return (1 + np.cumsum(hist)[observed]) / (1 + hist.sum())
+
+
+def _p_high_adjusted(maxima: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """Share of simulations whose most extreme number beats the observed value (max-statistic family-wise correction)."""
+    beaten = len(maxima) - np.searchsorted(np.sort(maxima), observed, side='left')
+    return (1 + beaten) / (1 + len(maxima))
+
+
+def _p_low_adjusted(minima: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    beaten = np.searchsorted(np.sort(minima), observed, side='right')
+    return (1 + beaten) / (1 + len(minima))
+
+
+def default_workers(n_draws: int) -> int:
+    """
+    One worker per CPU, but no more than half of the physical memory can hold
+    when every worker simulates a full batch at once.
+    """
+    cpus = os.cpu_count() or 1
+    batch_bytes = min(BATCH_CELLS, SIMULATIONS_PER_TASK * n_draws * 100) * BYTES_PER_CELL
+    try:
+        memory = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return 1 # Unknown memory: stay within one batch
+    return max(1, min(cpus, memory // 2 // batch_bytes))
+
+
+def run_simulations(slots: np.ndarray, n_sims: int = DEFAULT_SIMULATIONS, seed: int = DEFAULT_SEED,
+                    workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Runs the simulations in a process pool, each task with its own child of
+    SeedSequence(seed). `workers` defaults to default_workers().
+    """
+    workers = workers or default_workers(len(slots))
+    sizes = [min(SIMULATIONS_PER_TASK, n_sims - start) for start in range(0, n_sims, SIMULATIONS_PER_TASK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers == 1 or len(sizes) == 1:
+        tallies = [simulate(slots, size, child) for size, child in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tallies = list(executor.map(simulate, [slots] * len(sizes), sizes, seeds))
+    return _merge_tallies(tallies)
+
+
+def region_significance(region_code: str, n_sims: int = DEFAULT_SIMULATIONS, seed: int = DEFAULT_SEED,
+                        workers: Optional[int] = None, top_pairs: int = DEFAULT_TOP_PAIRS) -> Optional[Dict]:
+    """
+    Compares a region's observed frequencies, gaps and pair co-occurrences with
+    `n_sims` simulated histories of the same draws. Each number gets a raw p-value
+    and one adjusted for testing all 100 numbers (or all 4950 pairs) at once.
+    Returns None when the region has no data.
+    """
+    data_prefix = REGIONS[region_code].prefix
+    try:
+        with metrics.timer('significance.load', region=data_prefix):
+            dates, counts = load_counts(region_code)
+    except FileNotFoundError:
+        return None
+    if len(dates) == 0:
+        return None
+
+    slots = slots_per_draw(region_code, counts)
+    observed = {name: values[0] for name, values in draw_statistics(counts[:, None]).items()}
+
+    with metrics.timer('significance.simulate', region=data_prefix):
+        sims = run_simulations(slots, n_sims, seed, workers)
+    metrics.incr('rows_processed', n_sims * len(dates), region=data_prefix, stage='significance.simulate')
+    logger.info(f"Simulated {n_sims} histories of {len(dates)} {region_code} draws")
+
+    count, max_gap, current_gap = observed['count'], observed['max_gap'], observed['current_gap']
+    numbers = pd.DataFrame({
+        'number': [n.zfill(2) for n in NUMBERS],
+        'count': count,
+        'expected': slots.sum() / 100,
+        'p_high': _p_high(sims['count_hist'], count),
+        'p_high_adjusted': _p_high_adjusted(sims['count_max'], count),
+        'p_low': _p_low(sims['count_hist'], count),
+        'p_low_adjusted': _p_low_adjusted(sims['count_min'], count),
+        'max_gap': max_gap,
+        'max_gap_p': _p_high(sims['max_gap_hist'], max_gap),
+        'max_gap_p_adjusted': _p_high_adjusted(sims['max_gap_max'], max_gap),
+        'current_gap': current_gap,
+        'current_gap_p': _p_high(sims['current_gap_hist'], current_gap),
+        'current_gap_p_adjusted': _p_high_adjusted(sims['current_gap_max'], current_gap),
+    })
+
+    # Chance that two given numbers both appear in a draw of n prize numbers, summed over draws
+    both = 1 - 2 * 0.99 ** slots + 0.98 ** slots
+    together = observed['pair']
+    top = np.argsort(-together, kind='stable')[:top_pairs]
+    pairs = pd.DataFrame({
+        'pair': [f'{PAIRS[0][i]:02d}-{PAIRS[1][i]:02d}' for i in top],
+        'draws_together': together[top],
+        'expected': both.sum(),
+        'p_value': _p_high(sims['pair_hist'], together[top]),
+        'p_adjusted': _p_high_adjusted(sims['pair_max'], together[top]),
+    })
+
+    chi2 = float(observed['chi2'])
+    return {
+        'region': region_code,
+        'first_date': dates[0].date().isoformat(),
+        'last_date': dates[-1].date().isoformat(),
+        'draws': len(dates),
+        'prize_numbers': int(slots.sum()),
+        'simulations': n_sims,
+        'seed': seed,
+        'chi2': {'statistic': chi2, 'p_value': float((1 + np.sum(sims['chi2'] >= chi2)) / (1 + n_sims))},
+        'numbers': numbers,
+        'pairs': pairs,
+    }
+
+
+def result_to_json(result: Dict) -> Dict:
+    return {
+        **{key: value for key, value in result.items() if key not in ('numbers', 'pairs')},
+        'numbers': result['numbers'].to_dict(orient='records'),
+        'pairs': result['pairs'].to_dict(orient='records'),
+    }
+
+
+def _print_findings(result: Dict, alpha: float) -> None:
+    print(f"{result['region']}: {result['draws']} draws ({result['first_date']} to {result['last_date']}), "
+          f"{result['simulations']} simulations, chi-square p = {result['chi2']['p_value']:.4f}")
+    numbers, pairs = result['numbers'], result['pairs']
+    findings = [
+        ('more frequent than chance', numbers[numbers['p_high_adjusted'] < alpha], 'count', 'p_high_adjusted'),
+        ('less frequent than chance', numbers[numbers['p_low_adjusted'] < alpha], 'count', 'p_low_adjusted'),
+        ('longest gap unusually long', numbers[numbers['max_gap_p_adjusted'] < alpha], 'max_gap', 'max_gap_p_adjusted'),
+        ('current gap unusually long', numbers[numbers['current_gap_p_adjusted'] < alpha], 'current_gap', 'current_gap_p_adjusted'),
+    ]
+    for label, rows, value, p_value in findings:
+        for row in rows.itertuples():
+            print(f"  {row.number}: {label} ({value} {getattr(row, value)}, adjusted p = {getattr(row, p_value):.4f})")
+    for row in pairs[pairs['p_adjusted'] < alpha].itertuples():
+        print(f"  {row.pair}: drawn together unusually often ({row.draws_together} draws, adjusted p = {row.p_adjusted:.4f})")
+    if not any(len(rows) for _, rows, _, _ in findings) and not (pairs['p_adjusted'] < alpha).any():
+        print(f"  No deviation significant at {alpha} after adjusting for multiple comparisons")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Monte Carlo significance tests of number frequencies, gaps and pairs')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to test (repeatable). Defaults to all regions.')
+    parser.add_argument('--simulations', type=int, default=DEFAULT_SIMULATIONS, help='Simulated histories per region.')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Random seed; results do not depend on --workers.')
+    parser.add_argument('--workers', type=int, help='Worker processes. Defaults to the number of CPUs, limited by memory.')
+    parser.add_argument('--top-pairs', type=int, default=DEFAULT_TOP_PAIRS, help='Most frequent pairs to report.')
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='Adjusted p-value below which a deviation is printed.')
+    parser.add_argument('--output-dir', type=str, default='data', help='Directory for <prefix>-significance.json (ignored by git in data/). Empty to skip.')
+    parser.add_argument('--metrics-dir', type=str, default=DEFAULT_METRICS_DIR, help='Directory for the JSON run report and Prometheus metrics. Empty to disable.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    for region_code in args.region or list(REGIONS):
+        result = region_significance(region_code, args.simulations, args.seed, args.workers, args.top_pairs)
+        if result is None:
+            logger.warning(f"No data for region {region_code}. Skipping.")
+            continue
+        _print_findings(result, args.alpha)
+        if args.output_dir:
+            file_path = os.path.join(args.output_dir, f'{REGIONS[region_code].prefix}-significance.json')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(result_to_json(result), f, indent=2)
+            logger.info(f"Saved significance results to {file_path}")
+
+    if args.metrics_dir:
+        metrics.write(Path(args.metrics_dir), 'significance')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data_files import atomic_write
+from .models.regions import REGIONS
+from .ticket_checker import MAX_DIGITS, MIN_DIGITS, prize_fields
+
+logger = logging.getLogger('vietnam-lottery')
+
+INDEX_VERSION = 1
+POSTING_COLUMNS = ('suffix', 'day', 'province', 'field')
+
+Posting = Tuple[date, str, str]
+
+
+def _empty_postings() -> Dict[str, np.ndarray]:
+    return {
+        'suffix': np.zeros(0, dtype=np.int32),
+        'day': np.zeros(0, dtype=np.int32),
+        'province': np.zeros(0, dtype=np.int16),
+        'field': np.zeros(0, dtype=np.int16),
+    }
+
+
+class SuffixIndex:
+    """
+    Inverted index from number suffixes (2 to 6 digits) to posting lists of
+    (date, province, prize field), kept per suffix length as arrays sorted by
+    (suffix, date). On disk (data/<prefix>-suffix-index.npz) the suffix and day
+    columns are delta-encoded, which compresses to a fraction of the raw data.
+    """
+
+    def __init__(self, region_code: str) -> None:
+        self._region_code = region_code
+        region = REGIONS[region_code]
+        self._file_path = Path('data') / f'{region.prefix}-suffix-index.npz'
+        self._json_path = Path('data') / f'{region.prefix}.json'
+        self._fields = prize_fields(region.result_model, region.prize_digits)
+        self._field_names = [field for field, _, _ in self._fields]
+        self._provinces: List[str] = []
+        self._province_ids: Dict[str, int] = {}
+        self._postings: Dict[int, Dict[str, np.ndarray]] = {
+            length: _empty_postings() for length in range(MIN_DIGITS, MAX_DIGITS + 1)
+        }
+        self.loaded = False # Whether the postings reflect the data on disk
+
+    def exists(self) -> bool:
+        return self._file_path.exists()
+
+    def load(self) -> None:
+        with np.load(self._file_path) as archive:
+            if int(archive['version']) != INDEX_VERSION:
+                raise ValueError(f"Unsupported suffix index version in {self._file_path}")
+            if list(archive['fields']) != self._field_names:
+                raise ValueError(f"Suffix index {self._file_path} was built for different prize fields")
+            self._provinces = [str(p) for p in archive['provinces']]
+            self._province_ids = {p: i for i, p in enumerate(self._provinces)}
+            for length in self._postings:
+                self._postings[length] = {
+                    'suffix': np.cumsum(archive[f'{length}_suffix'], dtype=np.int32),
+                    'day': np.cumsum(archive[f'{length}_day'], dtype=np.int32),
+                    'province': archive[f'{length}_province'],
+                    'field': archive[f'{length}_field'],
+                }
+        self.loaded = True
+
+    def dump(self) -> None:
+        arrays = {
+            'version': np.asarray(INDEX_VERSION),
+            'fields': np.asarray(self._field_names),
+            'provinces': np.asarray(self._provinces, dtype=str),
+        }
+        for length, postings in self._postings.items():
+            # Deltas of sorted columns are mostly tiny, which is what makes the archive compact
+            arrays[f'{length}_suffix'] = np.diff(postings['suffix'], prepend=0).astype(np.int32)
+            arrays[f'{length}_day'] = np.diff(postings['day'], prepend=0).astype(np.int32)
+            arrays[f'{length}_province'] = postings['province']
+            arrays[f'{length}_field'] = postings['field']
+
+        with atomic_write(self._file_path) as tmp_path, open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        logger.info(f"Saved suffix index with {self.size()} postings to {self._file_path}")
+
+    def size(self) -> int:
+        return sum(len(postings['suffix']) for postings in self._postings.values())
+
+    def _province_id(self, province: str) -> int:
+        if province not in self._province_ids:
+            self._province_ids[province] = len(self._provinces)
+            self._provinces.append(province)
+        return self._province_ids[province]
+
+    def _build_postings(self, records: List[Dict]) -> Dict[int, Dict[str, np.ndarray]]:
+        days = np.array([date.fromisoformat(str(r['date'])).toordinal() for r in records], dtype=np.int32)
+        provinces = np.array([self._province_id(r.get('province', '')) for r in records], dtype=np.int16)
+
+        parts: Dict[int, List[Dict[str, np.ndarray]]] = {length: [] for length in self._postings}
+        for field_id, (field, _, width) in enumerate(self._fields):
+            values = np.array([r[field] for r in records], dtype=np.int64)
+            for length in range(MIN_DIGITS, width + 1):
+                parts[length].append({
+                    'suffix': (values % 10 ** length).astype(np.int32),
+                    'day': days,
+                    'province': provinces,
+                    'field': np.full(len(records), field_id, dtype=np.int16),
+                })
+
+        return {
+            length: {column: np.concatenate([p[column] for p in chunks]) for column in POSTING_COLUMNS}
+            for length, chunks in parts.items() if chunks
+        }
+
+    def update(self, records: Iterable[Dict]) -> None:
+        """
+        Indexes result records (model dumps or raw JSON items). Postings already
+        stored for the records' dates are replaced, so re-fetched or corrected
+        days never produce duplicates.
+        """
+        records = list(records)
+        if not records:
+            return
+
+        new_postings = self._build_postings(records)
+        replaced_days = np.unique([date.fromisoformat(str(r['date'])).toordinal() for r in records])
+
+        for length, postings in self._postings.items():
+            keep = ~np.isin(postings['day'], replaced_days)
+            merged = {column: postings[column][keep] for column in POSTING_COLUMNS}
+            if length in new_postings:
+                merged = {column: np.concatenate([merged[column], new_postings[length][column]]) for column in POSTING_COLUMNS}
+
+            order = np.lexsort((merged['field'], merged['province'], merged['day'], merged['suffix']))
+            self._postings[length] = {column: values[order] for column, values in merged.items()}
+
+    def rebuild(self) -> None:
+        """Rebuilds the whole index from the region's raw JSON file."""
+        with open(self._json_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        self._provinces, self._province_ids = [], {}
+        self._postings = {length: _empty_postings() for length in self._postings}
+        self.update(records)
+        self.loaded = True
+
+    def load_or_rebuild(self) -> bool:
+        """
+        Loads the index from disk, or rebuilds it from the raw JSON file when it
+        is missing, of another version or unreadable. Returns True if rebuilt.
+        """
+        if self.exists():
+            try:
+                self.load()
+                return False
+            except Exception as e:
+                logger.warning(f"Could not load suffix index {self._file_path}: {e}. Rebuilding.")
+        self.rebuild()
+        return True
+
+    def lookup(self, suffix: str) -> List[Posting]:
+        """Returns every (date, province, prize field) whose number ends in `suffix`, oldest first."""
+        length = len(suffix)
+        if not suffix.isdigit() or length not in self._postings:
+            raise ValueError(f"Suffix must be {MIN_DIGITS} to {MAX_DIGITS} digits, got {suffix!r}")
+
+        postings = self._postings[length]
+        value = int(suffix)
+        lo, hi = np.searchsorted(postings['suffix'], [value, value + 1])
+        return [
+            (date.fromordinal(int(day)), self._provinces[province], self._field_names[field])
+            for day, province, field in zip(
+                postings['day'][lo:hi].tolist(), postings['province'][lo:hi].tolist(), postings['field'][lo:hi].tolist()
+            )
+        ]
+
+
+def update_suffix_index(region_code: str, records: Iterable[Dict], index: Optional[SuffixIndex] = None) -> None:
+    """
+    Adds freshly fetched records to a region's index, rebuilding it first if it
+    does not exist or cannot be loaded. A loaded `index` kept from an earlier call
+    is updated in memory instead of being read from disk again.
+    """
+    index = index or SuffixIndex(region_code)
+    try:
+        if index.loaded or not index.load_or_rebuild():
+            index.update(records) # A rebuild already read them from the JSON file
+        index.dump()
+    except Exception as e:
+        index.loaded = False # Start over from disk next time
+        logger.error(f"Could not update suffix index for {region_code}: {e}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Find where numbers ending in a suffix appeared')
+    parser.add_argument('suffix', nargs='?', help='Number suffix of 2 to 6 digits, e.g. 123.')
+    parser.add_argument('--region', type=str, action='append', choices=list(REGIONS), help='Region to search (repeatable). Defaults to all regions.')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from the raw JSON data first.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    for region_code in args.region or list(REGIONS):
+        index = SuffixIndex(region_code)
+        if args.rebuild:
+            index.rebuild()
+            index.dump()
+        elif index.load_or_rebuild():
+            index.dump()
+
+        if args.suffix:
+            started = time.perf_counter()
+            postings = index.lookup(args.suffix)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for day, province, field in postings:
+                print(f"{region_code}\t{day.isoformat()}\t{province}\t{field}")
+            logger.info(f"{region_code}: {len(postings)} postings for *{args.suffix} in {elapsed_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import json
+import logging
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from .models.regions import REGIONS
+
+logger = logging.getLogger('vietnam-lottery')
+
+MIN_DIGITS = 2
+MAX_DIGITS = 6
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def prize_fields(ResultModel: Type[BaseModel], prize_digits: Dict[str, int]) -> List[Tuple[str, str, int]]:
+    """Lists (field, prize tier, digits) for every prize number of a result model."""
+    fields = []
+    for field in ResultModel.model_fields:
+        tier = field.split('_')[0]
+        if tier in prize_digits:
+            fields.append((field, tier, prize_digits[tier]))
+    return fields
+
+
+class DrawLookup:
+    """
+    Suffix lookup tables for a single draw (one MB result, or one province of MN/MT).
+
+    For every prize tier and every suffix length L up to the tier's width, a dense
+    array of size 10**L holds how many of the tier's numbers end in each L-digit suffix.
+    A ticket with d digits matches a tier number on its last min(d, width) digits, so
+    full-length tickets follow the traditional rules and 2-digit tickets behave like lô.
+    """
+
+    def __init__(self, result: BaseModel, prize_digits: Dict[str, int]) -> None:
+        self.tiers = list(prize_digits)
+        self._widths = np.array([prize_digits[tier] for tier in self.tiers])
+        self._tables: List[Dict[int, np.ndarray]] = []
+
+        numbers: Dict[str, List[int]] = {tier: [] for tier in self.tiers}
+        for field, tier, _ in prize_fields(type(result), prize_digits):
+            numbers[tier].append(getattr(result, field))
+
+        for tier in self.tiers:
+            width = prize_digits[tier]
+            values = np.asarray(numbers[tier], dtype=np.int64)
+            self._tables.append({
+                length: np.bincount(values % 10 ** length, minlength=10 ** length).astype(np.uint8)
+                for length in range(MIN_DIGITS, width + 1)
+            })
+
+    def match(self, numbers: np.ndarray, digits: np.ndarray) -> np.ndarray:
+        """
+        Returns a (tickets x tiers) matrix with how many numbers of each tier every ticket matches.
+        Tickets with fewer than 2 or more than 6 digits never match.
+        """
+        counts = np.zeros((len(numbers), len(self.tiers)), dtype=np.uint8)
+        for d in np.unique(digits):
+            if d < MIN_DIGITS or d > MAX_DIGITS:
+                continue
+            rows = np.flatnonzero(digits == d)
+            group = numbers[rows]
+            for i, table in enumerate(self._tables):
+                length = min(int(d), int(self._widths[i]))
+                counts[rows, i] = table[length][group % 10 ** length]
+        return counts
+
+
+def load_draw(region_code: str, selected_date: date) -> Dict[str, DrawLookup]:
+    """
+    Builds lookups for every result of a region on a date, keyed by province
+    (an empty string for MB, which has a single draw).
+    """
+    region = REGIONS[region_code]
+    file_path = Path('data') / f'{region.prefix}.json'
+    with open(file_path, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+
+    iso_date = selected_date.isoformat()
+    results = [region.result_model.model_validate(item) for item in json_data if item['date'] == iso_date]
+    if not results:
+        raise ValueError(f"No {region_code} results for {selected_date} in {file_path}")
+
+    return {getattr(result, 'province', ''): DrawLookup(result, region.prize_digits) for result in results}
+
+
+def parse_tickets(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Turns ticket strings (leading zeros significant) into (numbers, digit counts)."""
+    tickets = values.astype('string[pyarrow]').str.strip()
+    # Anything that is not a plain run of digits can never win
+    valid = tickets.str.isdigit().fillna(False).to_numpy(dtype=bool)
+    digits = np.where(valid, tickets.str.len().fillna(0).to_numpy(dtype=np.int64), 0)
+    numbers = pd.to_numeric(tickets.where(valid, '0')).to_numpy(dtype=np.int64)
+    return numbers, digits
+
+
+def check_tickets(lookups: Dict[str, DrawLookup], tickets: pd.DataFrame, province: Optional[str] = None) -> pd.DataFrame:
+    """
+    Matches a batch of tickets (a `number` column, and a `province` column for
+    multi-province draws unless `province` is given) against a draw. The `error`
+    column flags tickets that could not be checked: 'invalid_number' (not 2 to 6
+    digits) or 'province_not_drawn'.
+    """
+    numbers, digits = parse_tickets(tickets['number'])
+    tiers = next(iter(lookups.values())).tiers
+    invalid = (digits < MIN_DIGITS) | (digits > MAX_DIGITS)
+    not_drawn = np.zeros(len(tickets), dtype=bool)
+
+    if set(lookups) == {''}:
+        # MB has a single draw: any province column on its tickets is irrelevant
+        counts = lookups[''].match(numbers, digits)
+    else:
+        if province is not None:
+            provinces = pd.Series(province, index=tickets.index)
+        elif 'province' in tickets.columns:
+            provinces = tickets['province']
+        else:
+            raise ValueError(f"Tickets need a province column to check against {', '.join(lookups)}")
+
+        counts = np.zeros((len(tickets), len(tiers)), dtype=np.uint8)
+        codes, names = pd.factorize(provinces)
+        not_drawn[codes == -1] = True # No province given
+        for code, name in enumerate(names):
+            rows = np.flatnonzero(codes == code)
+            if name not in lookups:
+                not_drawn[rows] = True
+                continue
+            counts[rows] = lookups[name].match(numbers[rows], digits[rows])
+
+    result = tickets.reset_index(drop=True).copy()
+    for i, tier in enumerate(tiers):
+        result[tier] = counts[:, i]
+
+    won = counts > 0
+    best = np.where(won.any(axis=1), won.argmax(axis=1), -1)
+    result['best_prize'] = pd.Categorical.from_codes(best, categories=tiers)
+    error = np.where(invalid, 0, np.where(not_drawn, 1, -1))
+    result['error'] = pd.Categorical.from_codes(error, categories=['invalid_number', 'province_not_drawn'])
+    return result
+
+
+def iter_ticket_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, ticket_digits: int = MAX_DIGITS) -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV or Parquet ticket file in chunks, keeping ticket numbers as
+    strings (missing numbers stay missing). Integer columns have lost their
+    leading zeros, so they are padded back to `ticket_digits`.
+    """
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        padded = pa.types.is_integer(parquet_file.schema_arrow.field('number').type)
+        if padded:
+            logger.warning(f"Ticket numbers in {path} are integers. Padding them to {ticket_digits} digits.")
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            number = chunk['number'].astype('Int64' if padded else 'string').astype('string')
+            chunk['number'] = number.str.zfill(ticket_digits) if padded else number
+            yield chunk
+    else:
+        yield from pd.read_csv(path, dtype={'number': str, 'province': str}, chunksize=chunk_size)
+
+
+def check_ticket_file(path: str, lookups: Dict[str, DrawLookup], province: Optional[str] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, ticket_digits: int = MAX_DIGITS) -> Iterator[pd.DataFrame]:
+    for chunk in iter_ticket_chunks(path, chunk_size, ticket_digits):
+        yield check_tickets(lookups, chunk, province)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Check a batch of tickets against a draw')
+    parser.add_argument('--region', type=str, required=True, choices=list(REGIONS), help='Lottery region.')
+    parser.add_argument('--date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), required=True, help='Draw date in format YYYY-MM-DD.')
+    parser.add_argument('--tickets', type=str, required=True, help='CSV or Parquet file with a `number` column (and `province` for MN/MT).')
+    parser.add_argument('--province', type=str, help='Check every ticket against this province.')
+    parser.add_argument('--output', type=str, help='Write results to this CSV or Parquet path.')
+    parser.add_argument('--winners-only', action='store_true', help='Only write tickets that won something.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Tickets read per chunk.')
+    parser.add_argument('--ticket-digits', type=int, help='Width to zero-pad integer ticket numbers from Parquet to. Defaults to the special prize width.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    lookups = load_draw(args.region, args.date)
+    ticket_digits = args.ticket_digits or REGIONS[args.region].prize_digits['special']
+    started = time.perf_counter()
+    checked = 0
+    winners: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    writer = None
+    header_written = False
+
+    for result in check_ticket_file(args.tickets, lookups, args.province, args.chunk_size, ticket_digits):
+        checked += len(result)
+        for tier, count in result['best_prize'].value_counts().items():
+            winners[tier] = winners.get(tier, 0) + int(count)
+        for error, count in result['error'].value_counts().items():
+            errors[error] = errors.get(error, 0) + int(count)
+
+        if args.winners_only:
+            result = result[result['best_prize'].notna()]
+        if args.output:
+            if args.output.endswith('.parquet'):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                writer = writer or pq.ParquetWriter(args.output, table.schema)
+                writer.write_table(table)
+            else:
+                result.to_csv(args.output, mode='a' if header_written else 'w', header=not header_written, index=False)
+                header_written = True
+
+    if writer is not None:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    rate = checked / elapsed * 60 if elapsed > 0 else 0
+    logger.info(f"Checked {checked} tickets in {elapsed:.2f}s ({rate:,.0f} tickets/minute)")
+    for tier in next(iter(lookups.values())).tiers:
+        if winners.get(tier):
+            logger.info(f"  {tier}: {winners[tier]} winning tickets")
+    if errors.get('invalid_number'):
+        logger.warning(f"{errors['invalid_number']} tickets are not 2 to 6 digit numbers and were not checked")
+    if errors.get('province_not_drawn'):
+        logger.warning(f"{errors['province_not_drawn']} tickets are for a missing province or one that did not draw on {args.date}")
+
+
+if __name__ == '__main__':
+    main()
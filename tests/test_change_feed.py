@@ -0,0 +1,106 @@
+import json
+from itertools import islice
+
+import pytest
+
+from src.change_feed import append_changes, diff_records, follow, last_sequence, read_changes
+
+
+def mn_record(day: str, province: str, special: int) -> dict:
+    return {'date': day, 'province': province, 'special': special}
+
+
+@pytest.fixture
+def feed(tmp_path):
+    return tmp_path / 'changes.ndjson'
+
+
+def test_diff_records():
+    previous = [mn_record('2025-10-24', 'TPHCM', 1), mn_record('2025-10-24', 'Long An', 2)]
+    current = [
+        mn_record('2025-10-24', 'TPHCM', 1),      # unchanged
+        mn_record('2025-10-24', 'Long An', 3),    # corrected
+        mn_record('2025-10-25', 'TPHCM', 4),      # new date
+        mn_record('2025-10-24', 'Bình Phước', 5), # new province on a stored date
+    ]
+    assert diff_records(previous, current) == [
+        ('update', current[1]),
+        ('insert', current[2]),
+        ('insert', current[3]),
+    ]
+
+
+def test_diff_records_without_province():
+    previous = [{'date': '2025-10-24', 'special': 1}]
+    assert diff_records(previous, [{'date': '2025-10-24', 'special': 1}]) == []
+    assert diff_records(previous, [{'date': '2025-10-24', 'special': 2}]) == [('update', {'date': '2025-10-24', 'special': 2})]
+
+
+def test_append_and_read_from_offset(feed):
+    assert append_changes('MN', [], feed) == 0
+    assert not feed.exists()
+
+    first = [('insert', mn_record('2025-10-24', 'TPHCM', 1)), ('insert', mn_record('2025-10-24', 'Long An', 2))]
+    assert append_changes('MN', first, feed) == 2
+
+    changes, offset = read_changes(0, feed)
+    assert [(c['seq'], c['op'], c['province'], c['record']) for c in changes] == [
+        (1, 'insert', 'TPHCM', first[0][1]),
+        (2, 'insert', 'Long An', first[1][1]),
+    ]
+    assert offset == feed.stat().st_size
+
+    assert append_changes('MN', [('update', mn_record('2025-10-24', 'Long An', 3))], feed) == 3
+    changes, next_offset = read_changes(offset, feed)
+    assert [(c['seq'], c['op'], c['record']['special']) for c in changes] == [(3, 'update', 3)]
+    assert read_changes(next_offset, feed) == ([], next_offset)
+
+
+def test_torn_line(feed):
+    append_changes('MB', [('insert', {'date': '2025-10-24', 'special': 1})], feed)
+    complete = feed.stat().st_size
+    append_changes('MB', [('insert', {'date': '2025-10-25', 'special': 2})], feed)
+
+    # A crash in the middle of the second write
+    with open(feed, 'r+b') as f:
+        f.truncate(complete + 20)
+
+    # Readers stop before the partial line and do not move past it
+    changes, offset = read_changes(0, feed)
+    assert [c['seq'] for c in changes] == [1]
+    assert offset == complete
+    assert last_sequence(feed) == 1
+
+    # The next append terminates the torn line and carries on from the last complete change
+    assert append_changes('MB', [('insert', {'date': '2025-10-25', 'special': 3})], feed) == 2
+    lines = feed.read_bytes().split(b'\n')
+    assert len(lines[1]) == 20 and lines[2].startswith(b'{"seq": 2')
+
+    changes, _ = read_changes(offset, feed)
+    assert [(c['seq'], c['record']['special']) for c in changes] == [(2, 3)]
+
+
+def test_read_missing_feed_and_bad_offset(feed):
+    assert read_changes(0, feed) == ([], 0)
+    append_changes('MB', [('insert', {'date': '2025-10-24', 'special': 1})], feed)
+    with pytest.raises(ValueError):
+        read_changes(feed.stat().st_size + 1, feed)
+
+
+def test_follow_picks_up_appended_changes(feed):
+    append_changes('MT', [('insert', {'date': '2025-10-24', 'province': 'Huế', 'special': 1})], feed)
+    tail = follow(0, interval=0.01, file_path=feed)
+
+    change, offset = next(tail)
+    assert change['seq'] == 1
+    assert offset == feed.stat().st_size
+
+    append_changes('MT', [('update', {'date': '2025-10-24', 'province': 'Huế', 'special': 2}),
+                          ('insert', {'date': '2025-10-25', 'province': 'Huế', 'special': 3})], feed)
+    followed = list(islice(tail, 2))
+    assert [(c['seq'], c['op']) for c, _ in followed] == [(2, 'update'), (3, 'insert')]
+    assert followed[-1][1] == feed.stat().st_size
+
+    # Every offset handed out resumes exactly after its change
+    assert [c['seq'] for c in read_changes(offset, feed)[0]] == [2, 3]
+    assert json.loads(feed.read_text(encoding='utf-8').splitlines()[0])['region'] == 'MT'
@@ -0,0 +1,101 @@
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from benchmarks.run import LOTTERIES, FixtureResponse, FixtureSession
+from benchmarks.synthetic import FIXTURES_DIR, render_page
+from src.models.regions import REGIONS
+from src.ticket_checker import prize_fields
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+# What the fixture pages show, by province, in the field order of the result models.
+# Written out by hand rather than read from data/, so a parser regression cannot
+# agree with results it stored itself.
+EXPECTED = {
+    'MB': {
+        None: [77962, 82883, 36158, 49284, 19413, 45519, 51065, 73373, 38027, 73333, 7939, 5592, 3142, 4474,
+               8506, 8522, 7564, 5894, 2443, 2176, 493, 852, 317, 87, 65, 52, 99],
+    },
+    'MN': {
+        'TPHCM': [16855, 38816, 60342, 32663, 32110, 71662, 44287, 56886, 8893, 19288, 97699, 12813, 9617, 8804, 9443, 6823, 367, 34],
+        'Long An': [248337, 31867, 97731, 67412, 9385, 82914, 60057, 67506, 2322, 93910, 73621, 26764, 1310, 3998, 6791, 9123, 124, 35],
+        'Bình Phước': [651817, 72311, 80178, 66706, 15666, 19063, 70030, 86050, 76598, 92289, 88371, 23818, 6400, 3295, 8514, 850, 913, 33],
+        'Hậu Giang': [408671, 38098, 6799, 59398, 61058, 82578, 97550, 61046, 61104, 13370, 16494, 29296, 5548, 8746, 919, 609, 91, 25],
+    },
+    'MT': {
+        'Đà Nẵng': [912916, 38634, 11659, 19317, 65522, 84792, 28813, 60244, 81916, 48895, 73800, 55376, 9303, 1396, 1308, 9391, 2, 66],
+        'Quảng Ngãi': [17201, 6437, 23645, 31965, 37145, 24888, 20986, 53807, 4551, 81350, 88886, 85393, 261, 4979, 8213, 9323, 963, 97],
+        'Đắk Nông': [401390, 40554, 59330, 98505, 25519, 85515, 44478, 18322, 50210, 48122, 96303, 41795, 3864, 4455, 6604, 2756, 858, 83],
+    },
+}
+
+
+class PageSession:
+    """Serves one page for every URL."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def get(self, url: str, **kwargs) -> FixtureResponse:
+        return FixtureResponse(200, self.text)
+
+
+def _fixture(region_code):
+    fixture = next(FIXTURES_DIR.glob(f'{REGIONS[region_code].prefix}-*.html'))
+    return fixture, datetime.strptime(fixture.stem.split('-', 1)[1], '%d-%m-%Y').date()
+
+
+def _stored_records(region_code, selected_date):
+    with open(DATA_DIR / f'{REGIONS[region_code].prefix}.json', 'r', encoding='utf-8') as f:
+        return [record for record in json.load(f) if record['date'] == selected_date.isoformat()]
+
+
+def _fetch(region_code, selected_date, session):
+    lottery = LOTTERIES[region_code]()
+    lottery._http = session
+    results = lottery.fetch(selected_date)
+    if not results:
+        return []
+    return [result.model_dump(mode='json') for result in (results if isinstance(results, list) else [results])]
+
+
+@pytest.fixture(autouse=True)
+def empty_dir(tmp_path, monkeypatch):
+    """The lottery classes create ./data; keep it out of the repository."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_fixture_parses_to_expected_results(region_code):
+    _, selected_date = _fixture(region_code)
+    region = REGIONS[region_code]
+    fields = [field for field, _, _ in prize_fields(region.result_model, region.prize_digits)]
+    expected = [
+        {'date': selected_date.isoformat(), **({'province': province} if province else {}), **dict(zip(fields, numbers))}
+        for province, numbers in EXPECTED[region_code].items()
+    ]
+    assert _fetch(region_code, selected_date, FixtureSession()) == expected
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_stub_page_parses_to_its_records(region_code):
+    """The stub server's pages must read back exactly like the site's."""
+    _, selected_date = _fixture(region_code)
+    records = _stored_records(region_code, selected_date)
+    page = render_page(region_code, selected_date, records)
+    assert _fetch(region_code, selected_date, PageSession(page)) == records
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_incomplete_page_is_skipped(region_code):
+    _, selected_date = _fixture(region_code)
+    records = _stored_records(region_code, selected_date)
+    page = render_page(region_code, selected_date, records, incomplete_tiers=('special',))
+    assert _fetch(region_code, selected_date, PageSession(page)) == []
+
+
+def test_missing_page_is_skipped():
+    assert _fetch('MB', date(2000, 1, 1), FixtureSession()) == []
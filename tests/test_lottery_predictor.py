@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lottery_predictor import FeatureStore, build_features
+
+
+@pytest.fixture
+def history():
+    counts = np.random.default_rng(2).poisson(0.27, size=(120, 100)).astype(np.int64)
+    dates = pd.date_range('2025-06-01', periods=len(counts), freq='D')
+    return dates, counts
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return tmp_path / 'data'
+
+
+def test_lag_and_rolling_features(history):
+    dates, counts = history
+    features = build_features(dates, counts).set_index(['draw', 'number'])
+
+    row = features.loc[(50, 7)]
+    assert row['lag_1'] == counts[50, 7] and row['lag_3'] == counts[48, 7]
+    assert row['roll_7'] == pytest.approx(counts[44:51, 7].mean())
+    assert row['expanding_mean'] == pytest.approx(counts[:51, 7].mean())
+    assert row['target'] == (counts[51, 7] > 0)
+    assert row['target_weekday'] == dates[51].weekday()
+
+    # Windows longer than the history so far average over what exists
+    assert features.loc[(1, 7), 'roll_90'] == pytest.approx(counts[:2, 7].mean())
+    assert features.loc[(1, 7), 'lag_7'] == 0
+    assert features.loc[(119, 0), 'target'] != features.loc[(119, 0), 'target'] # NaN for the draw to predict
+
+
+@pytest.mark.parametrize('start', [1, 6, 60, 119])
+def test_build_from_a_later_draw_matches_the_full_table(history, start):
+    dates, counts = history
+    full = build_features(dates, counts)
+    tail = build_features(dates, counts, start)
+    pd.testing.assert_frame_equal(tail, full[full['draw'] >= start].reset_index(drop=True))
+
+
+def test_store_appends_new_draws(history, data_dir, caplog):
+    dates, counts = history
+    store = FeatureStore('xstest')
+    store.get(dates[:100], counts[:100])
+
+    with caplog.at_level('INFO', logger='vietnam-lottery'):
+        features = store.get(dates, counts)
+    assert 'Appended features for 20 new draws' in caplog.text
+    pd.testing.assert_frame_equal(features, build_features(dates, counts))
+
+    # The appended table is what the next run loads
+    pd.testing.assert_frame_equal(FeatureStore('xstest').get(dates, counts), build_features(dates, counts))
+
+
+def test_store_rebuilds_after_a_correction(history, data_dir, caplog):
+    dates, counts = history
+    store = FeatureStore('xstest')
+    store.get(dates[:100], counts[:100])
+
+    corrected = counts.copy()
+    corrected[40, 3] += 1
+    with caplog.at_level('INFO', logger='vietnam-lottery'):
+        features = store.get(dates, corrected)
+    assert 'Appended' not in caplog.text
+    pd.testing.assert_frame_equal(features, build_features(dates, corrected))
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lottery_stats import (NUMBERS, REGION_GROUP, STAT_FIELDS, GapStatsCache, compute_gap_stats,
+                               empty_gap_stats, history_fingerprint, incidence_matrix, update_gap_stats)
+
+
+def brute_force_gap_stats(hits: np.ndarray) -> dict:
+    """Walks every column draw by draw, as the STAT_FIELDS comments define them."""
+    stats = empty_gap_stats(hits.shape[1])
+    for number in range(hits.shape[1]):
+        column = [bool(hit) for hit in hits[:, number]]
+        seen = False
+        gap = streak = 0
+        for hit in column:
+            if hit:
+                if seen and gap:
+                    stats['gap_sum'][number] += gap
+                    stats['gap_count'][number] += 1
+                    stats['max_gap'][number] = max(stats['max_gap'][number], gap)
+                seen = True
+                gap = 0
+                streak += 1
+                stats['max_streak'][number] = max(stats['max_streak'][number], streak)
+            else:
+                gap += 1
+                streak = 0
+        stats['draws'][number] = len(column)
+        stats['appearances'][number] = sum(column)
+        stats['current_gap'][number] = gap
+        stats['current_streak'][number] = streak
+    return stats
+
+
+def assert_stats_equal(actual: dict, expected: dict) -> None:
+    for field in STAT_FIELDS:
+        np.testing.assert_array_equal(actual[field], expected[field], err_msg=field)
+
+
+@pytest.fixture
+def hits() -> np.ndarray:
+    """
+    Random draws plus columns the run-length bookkeeping has to special-case:
+    never seen, always seen, seen only in the first or last draw, and a number
+    that stops appearing after the first block.
+    """
+    rng = np.random.default_rng(0)
+    matrix = rng.random((40, 12)) < 0.3
+    matrix[:, 0] = False
+    matrix[:, 1] = True
+    matrix[:, 2] = False
+    matrix[0, 2] = True
+    matrix[:, 3] = False
+    matrix[-1, 3] = True
+    matrix[:, 4] = np.arange(40) < 10
+    return matrix
+
+
+def test_compute_matches_brute_force(hits):
+    assert_stats_equal(compute_gap_stats(hits), brute_force_gap_stats(hits))
+
+
+@pytest.mark.parametrize('split', [1, 2, 10, 17, 39])
+def test_update_at_any_split_matches_full_history(hits, split):
+    state = compute_gap_stats(hits[:split])
+    assert_stats_equal(update_gap_stats(state, hits[split:]), compute_gap_stats(hits))
+
+
+@pytest.mark.parametrize('splits', [[5, 10, 15], [1, 2, 3, 4], [10, 11, 30, 39]])
+def test_update_in_several_blocks(hits, splits):
+    state = empty_gap_stats(hits.shape[1])
+    for block in np.split(hits, splits):
+        state = update_gap_stats(state, block)
+    assert_stats_equal(state, brute_force_gap_stats(hits))
+
+
+def test_update_with_blocks_without_or_only_hits():
+    """Whole blocks of misses carry the gap over, whole blocks of hits carry the streak over."""
+    first = np.array([[True, False, True], [False, False, True]])
+    misses = np.zeros((3, 3), dtype=bool)
+    all_hits = np.ones((2, 3), dtype=bool)
+    history = np.vstack([first, misses, all_hits, misses])
+
+    state = compute_gap_stats(first)
+    for block in (misses, all_hits, misses):
+        state = update_gap_stats(state, block)
+    assert_stats_equal(state, brute_force_gap_stats(history))
+
+    # Column 1 was never seen before the hits: its leading gap is censored, not a gap
+    assert state['gap_count'][1] == 0
+    assert state['max_streak'][2] == 2
+
+
+def test_update_with_empty_block(hits):
+    state = compute_gap_stats(hits)
+    assert update_gap_stats(state, hits[:0]) is state
+
+
+def sparse_frame(counts: np.ndarray, start: str = '2025-01-01', province: str = None) -> pd.DataFrame:
+    df = pd.DataFrame(counts, columns=NUMBERS)
+    df.insert(0, 'date', pd.date_range(start, periods=len(counts), freq='D'))
+    if province is not None:
+        df.insert(1, 'province', province)
+    return df
+
+
+@pytest.fixture
+def counts() -> np.ndarray:
+    return np.random.default_rng(1).poisson(0.27, size=(60, 100)).astype(np.int64)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return tmp_path / 'data'
+
+
+def cached_stats(cache: GapStatsCache, group: str = REGION_GROUP) -> dict:
+    return cache._groups[group]['stats']
+
+
+def test_cache_updates_incrementally(counts, data_dir):
+    cache = GapStatsCache('xstest')
+    for end in (20, 21, 45, 60):
+        cache.update(sparse_frame(counts[:end]))
+        assert_stats_equal(cached_stats(cache), brute_force_gap_stats(counts[:end] > 0))
+
+    # A fresh cache reads the file back and carries on from its watermark
+    reloaded = GapStatsCache('xstest')
+    reloaded.load()
+    assert reloaded._groups[REGION_GROUP]['last_date'] == pd.Timestamp('2025-03-01')
+    assert_stats_equal(cached_stats(reloaded), cached_stats(cache))
+
+
+def test_cache_rebuilds_after_correction_behind_watermark(counts, data_dir):
+    cache = GapStatsCache('xstest')
+    cache.update(sparse_frame(counts[:40]))
+
+    corrected = counts.copy()
+    corrected[10] = 0
+    corrected[10, 7] = 27
+    table = cache.update(sparse_frame(corrected))
+
+    assert_stats_equal(cached_stats(cache), brute_force_gap_stats(corrected > 0))
+    dates, matrix = incidence_matrix(sparse_frame(corrected))
+    assert cache._groups[REGION_GROUP]['fingerprint'] == history_fingerprint(dates, matrix)
+    assert table.loc[table['number'] == '07', 'appearances'].item() == int((corrected[:, 7] > 0).sum())
+
+
+def test_cache_rebuilds_after_backfill(counts, data_dir):
+    cache = GapStatsCache('xstest')
+    cache.update(sparse_frame(counts[30:], start='2025-01-31'))
+    cache.update(sparse_frame(counts))
+    assert_stats_equal(cached_stats(cache), brute_force_gap_stats(counts > 0))
+
+
+def test_cache_keeps_provinces_apart(counts, data_dir):
+    sparse = pd.concat([sparse_frame(counts[:30], province='A'), sparse_frame(counts[30:], province='B')], ignore_index=True)
+    cache = GapStatsCache('xstest')
+    cache.update(sparse)
+
+    assert_stats_equal(cached_stats(cache, 'A'), brute_force_gap_stats(counts[:30] > 0))
+    assert_stats_equal(cached_stats(cache, 'B'), brute_force_gap_stats(counts[30:] > 0))
+    assert_stats_equal(cached_stats(cache), brute_force_gap_stats((counts[:30] + counts[30:]) > 0))
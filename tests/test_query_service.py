@@ -0,0 +1,110 @@
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_records, write_history
+from src.models.regions import REGIONS
+from src.query_service import QueryService
+from src.ticket_checker import prize_fields
+
+FIELDS = [field for field, _, _ in prize_fields(REGIONS['MN'].result_model, REGIONS['MN'].prize_digits)]
+
+
+def frequency(records, start=None, end=None):
+    counts = np.zeros(100, dtype=np.int64)
+    for record in records:
+        if (not start or record['date'] >= start) and (not end or record['date'] <= end):
+            for field in FIELDS:
+                counts[record[field] % 100] += 1
+    return counts
+
+
+@pytest.fixture
+def records():
+    return generate_records('MN', 0.05, date(2025, 10, 25), seed=5)
+
+
+@pytest.fixture
+def service(records, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_history('MN', records, tmp_path / 'data')
+    service = QueryService(['MN'])
+    assert service.reload(force=True)
+    return service
+
+
+def get(service, path, query=''):
+    status, body = service.handle(path, query)
+    return status, json.loads(body)
+
+
+def test_dates_and_latest(service, records):
+    assert get(service, '/MN/dates/2025-10-25') == (200, [r for r in records if r['date'] == '2025-10-25'])
+    assert get(service, '/mn') == (200, [r for r in records if r['date'] == '2025-10-25'])
+    assert get(service, '/MN/dates/2025-01-01')[0] == 404
+    assert get(service, '/MN/dates/garbage')[0] == 400
+    assert get(service, '/XX/latest')[0] == 404
+
+
+def test_province_range(service, records):
+    status, body = get(service, '/MN/provinces/TPHCM', 'start=2025-10-13&end=2025-10-20')
+    assert status == 200
+    assert body == [r for r in records if r['province'] == 'TPHCM' and '2025-10-13' <= r['date'] <= '2025-10-20']
+    assert [r['date'] for r in body] == ['2025-10-13', '2025-10-18', '2025-10-20'] # Mondays and Saturdays
+
+    status, body = get(service, '/MN/provinces/TPHCM', 'limit=1')
+    assert body == [r for r in records if r['province'] == 'TPHCM'][-1:]
+    assert get(service, '/MN/provinces/Nowhere')[0] == 404
+
+
+@pytest.mark.parametrize('query', ['start=zzz', 'end=2025-13-01', 'start=2025-10-01&end=garbage', 'limit=-1'])
+def test_province_range_rejects_bad_parameters(service, query):
+    status, body = get(service, '/MN/provinces/TPHCM', query)
+    assert status == 400
+    assert 'error' in body
+
+
+def test_frequency(service, records):
+    status, body = get(service, '/MN/frequency', 'start=2025-10-10&end=2025-10-20&top=5')
+    assert status == 200
+    expected = frequency(records, '2025-10-10', '2025-10-20')
+    assert body['start'] == '2025-10-10' and body['end'] == '2025-10-20' and body['dates'] == 11
+    assert len(body['frequency']) == 5
+    assert all(count == expected[int(number)] for number, count in body['frequency'].items())
+    assert list(body['frequency'].values()) == sorted(expected, reverse=True)[:5]
+
+    status, body = get(service, '/MN/frequency')
+    assert sum(body['frequency'].values()) == frequency(records).sum()
+
+
+@pytest.mark.parametrize('query', ['start=garbage', 'end=2025-02-30', 'top=-3'])
+def test_frequency_rejects_bad_parameters(service, query):
+    assert get(service, '/MN/frequency', query)[0] == 400
+
+
+def test_numbers(service, records):
+    status, body = get(service, '/MN/numbers/' + str(records[0]['special']).zfill(6))
+    assert status == 200
+    assert {'date': records[0]['date'], 'province': records[0]['province'], 'prize': 'special'} in body
+    assert get(service, '/MN/numbers/1')[0] == 400
+
+
+def test_reload_invalidates_cached_responses(service, records, tmp_path):
+    before = service.handle('/MN/frequency', '')
+    assert service.handle('/MN/frequency', '') is before # Served from the cache
+    assert not service.reload() # Nothing changed on disk
+
+    added = [dict(r, date='2025-10-26') for r in records if r['date'] == '2025-10-25']
+    json_path = write_history('MN', records + added, tmp_path / 'data')
+    stat = json_path.stat()
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert service.reload()
+
+    status, body = get(service, '/MN/frequency')
+    assert body['end'] == '2025-10-26'
+    assert sum(body['frequency'].values()) == frequency(records + added).sum()
+    assert get(service, '/MN') == (200, added)
+    assert get(service, '/regions')[1][0]['last_date'] == '2025-10-26'
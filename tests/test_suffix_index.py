@@ -0,0 +1,114 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_records, write_history
+from src.models.regions import REGIONS
+from src.suffix_index import SuffixIndex, update_suffix_index
+from src.ticket_checker import prize_fields
+
+FIELDS = prize_fields(REGIONS['MN'].result_model, REGIONS['MN'].prize_digits)
+
+
+def brute_force_lookup(records, suffix):
+    return sorted(
+        (date.fromisoformat(r['date']), r['province'], field)
+        for r in records for field, _, width in FIELDS
+        if width >= len(suffix) and str(r[field]).zfill(width).endswith(suffix)
+    )
+
+
+@pytest.fixture
+def records():
+    records = generate_records('MN', 0.05, date(2025, 10, 25), seed=3)
+    # Suffixes with known postings, including leading zeros
+    records[0]['special'] = 123456
+    records[1]['prize4_2'] = 3456
+    records[-1]['prize8'] = 56
+    records[-1]['prize7'] = 7
+    return records
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / 'data'
+
+
+def test_lookup(records):
+    index = SuffixIndex('MN')
+    index.update(records)
+
+    for suffix in ('56', '456', '3456', '23456', '123456', '07', '007', '00'):
+        postings = index.lookup(suffix)
+        assert sorted(postings) == brute_force_lookup(records, suffix), suffix
+        assert [day for day, _, _ in postings] == sorted(day for day, _, _ in postings)
+
+    assert (date(2025, 10, 25), records[-1]['province'], 'prize7') in index.lookup('007')
+    assert index.lookup('999999') == brute_force_lookup(records, '999999')
+
+
+@pytest.mark.parametrize('suffix', ['1', '1234567', '12a', ''])
+def test_lookup_rejects_bad_suffixes(suffix):
+    with pytest.raises(ValueError):
+        SuffixIndex('MN').lookup(suffix)
+
+
+def test_update_replaces_postings_of_the_same_day(records):
+    index = SuffixIndex('MN')
+    index.update(records)
+    size = index.size()
+
+    updated = [dict(r) for r in records]
+    updated[-1]['prize8'] = 98
+    index.update([r for r in updated if r['date'] == updated[-1]['date']])
+
+    assert index.size() == size
+    for suffix in ('56', '98', str(updated[-1]['special'])[-2:]):
+        assert sorted(index.lookup(suffix)) == brute_force_lookup(updated, suffix)
+
+
+def test_dump_delta_encodes_and_loads_back(records, data_dir):
+    write_history('MN', records, data_dir)
+    index = SuffixIndex('MN')
+    index.update(records)
+    index.dump()
+
+    with np.load(data_dir / 'xsmn-suffix-index.npz') as archive:
+        for length, postings in index._postings.items():
+            deltas = archive[f'{length}_suffix']
+            assert (deltas[1:] >= 0).all()
+            np.testing.assert_array_equal(np.cumsum(deltas), postings['suffix'])
+            np.testing.assert_array_equal(np.cumsum(archive[f'{length}_day']), postings['day'])
+
+    loaded = SuffixIndex('MN')
+    loaded.load()
+    assert loaded.loaded
+    for suffix in ('56', '3456', '123456'):
+        assert loaded.lookup(suffix) == index.lookup(suffix)
+
+
+@pytest.mark.parametrize('damage', ['corrupt', 'version'])
+def test_update_rebuilds_an_unloadable_index(records, data_dir, damage):
+    write_history('MN', records, data_dir)
+    index_path = data_dir / 'xsmn-suffix-index.npz'
+    if damage == 'corrupt':
+        index_path.write_bytes(b'not an npz archive')
+    else:
+        SuffixIndex('MN').dump()
+        with np.load(index_path) as archive:
+            arrays = dict(archive)
+        arrays['version'] = np.asarray(0)
+        with open(index_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    index = SuffixIndex('MN')
+    update_suffix_index('MN', records[-4:], index)
+    assert index.loaded
+    assert sorted(index.lookup('56')) == brute_force_lookup(records, '56')
+
+    # The rebuilt index was written back, so the next process loads it fine
+    reloaded = SuffixIndex('MN')
+    assert not reloaded.load_or_rebuild()
+    assert reloaded.lookup('123456') == index.lookup('123456')
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from itertools import groupby
+
+import numpy as np
+import pytest
+
+from benchmarks.run import LOTTERIES
+from benchmarks.synthetic import generate_records, provinces_for, write_history
+from src.lottery_stats import compute_gap_stats, incidence_matrix, load_counts
+from src.models.regions import REGIONS
+from src.significance import draw_statistics, slots_per_draw
+from src.ticket_checker import prize_fields
+
+END_DATE = date(2025, 10, 25)
+
+# 99.9% quantile of the chi-square distribution with 99 degrees of freedom
+CHI2_99_DOF_999 = 148.23
+
+
+def _fields(region_code):
+    region = REGIONS[region_code]
+    return prize_fields(region.result_model, region.prize_digits)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Runs the test in an empty directory, as the lottery classes read and write ./data."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / 'data'
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_records_match_result_model(region_code):
+    region = REGIONS[region_code]
+    fields = _fields(region_code)
+    records = generate_records(region_code, 1, END_DATE)
+
+    keys = {'date', *(field for field, _, _ in fields)} | ({'province'} if region_code != 'MB' else set())
+    for record in records:
+        assert set(record) == keys
+        region.result_model.model_validate(record)
+
+    for field, _, digits in fields:
+        values = np.array([record[field] for record in records])
+        assert values.min() >= 0
+        assert values.max() < 10 ** digits
+        # The whole width is used, not just the last two digits
+        assert values.max() >= 10 ** (digits - 1)
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_records_follow_schedule(region_code):
+    records = generate_records(region_code, 1, END_DATE)
+    days = [(day, [record.get('province') for record in group]) for day, group in groupby(records, key=lambda r: r['date'])]
+
+    expected_dates = [(END_DATE - timedelta(days=offset)).isoformat() for offset in range(364, -1, -1)]
+    assert [day for day, _ in days] == expected_dates
+    for day, provinces in days:
+        assert provinces == provinces_for(region_code, date.fromisoformat(day))
+
+
+def test_records_are_reproducible():
+    assert generate_records('MN', 0.1, seed=1) == generate_records('MN', 0.1, seed=1)
+    assert generate_records('MN', 0.1, seed=1) != generate_records('MN', 0.1, seed=2)
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_incidence_matrix_shape(region_code, data_dir):
+    records = generate_records(region_code, 1, END_DATE)
+    write_history(region_code, records, data_dir)
+
+    lottery = LOTTERIES[region_code]()
+    lottery.load()
+    lottery.generate_dataframes()
+    dates, counts = incidence_matrix(lottery._sparse_data)
+
+    expected_dates = sorted({record['date'] for record in records})
+    assert [day.date().isoformat() for day in dates] == expected_dates
+    assert counts.shape == (len(expected_dates), 100)
+    assert counts.dtype == np.int64
+
+    # Every prize number of every province drawing that day lands in exactly one column
+    per_day = [len(_fields(region_code)) * len(provinces_for(region_code, date.fromisoformat(day))) for day in expected_dates]
+    np.testing.assert_array_equal(slots_per_draw(region_code, counts), per_day)
+
+    # The analysis tools read the dumped files back into the same matrix
+    lottery.dump()
+    loaded_dates, loaded_counts = load_counts(region_code)
+    assert loaded_dates.equals(dates)
+    np.testing.assert_array_equal(loaded_counts, counts)
+
+
+@pytest.mark.parametrize('region_code', list(REGIONS))
+def test_two_digit_endings_are_uniform(region_code, data_dir):
+    """The null hypothesis of significance.py: last two digits uniform over 00-99."""
+    write_history(region_code, generate_records(region_code, 10, END_DATE), data_dir)
+    lottery = LOTTERIES[region_code]()
+    lottery.load()
+    lottery.generate_dataframes()
+    _, counts = incidence_matrix(lottery._sparse_data)
+
+    chi2 = draw_statistics(counts[:, None, :])['chi2'][0]
+    assert chi2 < CHI2_99_DOF_999
+
+    # A number shows up in a draw of n prize numbers with probability 1 - 0.99^n
+    slots = slots_per_draw(region_code, counts)
+    stats = compute_gap_stats(counts > 0)
+    expected = (1 - 0.99 ** slots).sum() * 100
+    assert stats['appearances'].sum() == pytest.approx(expected, rel=0.02)
@@ -0,0 +1,139 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.regions import REGIONS
+from src.ticket_checker import DrawLookup, check_tickets, check_ticket_file, iter_ticket_chunks, prize_fields
+
+
+def make_result(region_code: str, province: str = None, **numbers):
+    """
+    A result whose prize numbers all end in different two digits (10, 11, ...),
+    so a ticket only matches the numbers a test sets explicitly.
+    """
+    region = REGIONS[region_code]
+    record = {'date': date(2025, 10, 25)}
+    if province is not None:
+        record['province'] = province
+    for i, (field, _, digits) in enumerate(prize_fields(region.result_model, region.prize_digits)):
+        record[field] = (7 * 10 ** (digits - 1) + 100 * i + 10 + i) % 10 ** digits
+    record.update(numbers)
+    return region.result_model(**record)
+
+
+def tier_counts(result: pd.DataFrame, row: int) -> dict:
+    tiers = [column for column in result.columns if column.startswith(('special', 'prize'))]
+    return {tier: int(result.loc[row, tier]) for tier in tiers if result.loc[row, tier]}
+
+
+@pytest.fixture
+def mb_lookups():
+    result = make_result('MB', special=12345, prize4_2=2345, prize7_1=45, prize7_2=45)
+    return {'': DrawLookup(result, REGIONS['MB'].prize_digits)}
+
+
+def test_full_and_partial_suffix_matches(mb_lookups):
+    tickets = pd.DataFrame({'number': ['12345', '012345', '2345', '345', '45', '99945', '70111', '99111']})
+    result = check_tickets(mb_lookups, tickets)
+
+    # Every tier compares the last min(ticket, prize) digits: a full-width ticket also
+    # wins the narrower prizes it ends in, and a longer one compares its last 5 digits
+    everything = {'special': 1, 'prize4': 1, 'prize7': 2}
+    assert tier_counts(result, 0) == everything
+    assert tier_counts(result, 1) == everything
+    # Shorter tickets match the end of wider prizes
+    assert tier_counts(result, 2) == everything
+    assert tier_counts(result, 3) == everything
+    # 2 digits behave like lô: every number ending in 45, twice for the two prize7 numbers
+    assert tier_counts(result, 4) == everything
+    # Same last 2 digits, but the wider prizes compare more digits
+    assert tier_counts(result, 5) == {'prize7': 2}
+    assert tier_counts(result, 6) == {'prize1': 1}
+    assert tier_counts(result, 7) == {}
+
+    assert result['best_prize'].tolist() == ['special'] * 5 + ['prize7', 'prize1', np.nan]
+    assert result['error'].isna().all()
+
+
+def test_no_match(mb_lookups):
+    result = check_tickets(mb_lookups, pd.DataFrame({'number': ['99999', '00']}))
+    assert result['best_prize'].isna().all()
+    assert not result.filter(like='prize').drop(columns='best_prize').to_numpy().any()
+
+
+def test_invalid_numbers(mb_lookups):
+    tickets = pd.DataFrame({'number': ['1', '1234567', '12a45', '', None, ' 45 ']})
+    result = check_tickets(mb_lookups, tickets)
+    assert result['error'].tolist()[:5] == ['invalid_number'] * 5
+    assert result['best_prize'].tolist()[:5] == [np.nan] * 5
+    # Surrounding whitespace is not part of the number
+    assert pd.isna(result.loc[5, 'error'])
+    assert result.loc[5, 'best_prize'] == 'special'
+
+
+def test_mb_ignores_province(mb_lookups):
+    tickets = pd.DataFrame({'number': ['12345'], 'province': ['Nowhere']})
+    result = check_tickets(mb_lookups, tickets)
+    assert pd.isna(result.loc[0, 'error'])
+    assert result.loc[0, 'best_prize'] == 'special'
+
+
+@pytest.fixture
+def mn_lookups():
+    digits = REGIONS['MN'].prize_digits
+    return {
+        'TPHCM': DrawLookup(make_result('MN', 'TPHCM', special=123456), digits),
+        'Long An': DrawLookup(make_result('MN', 'Long An', prize8=56), digits),
+    }
+
+
+def test_province_not_drawn(mn_lookups):
+    tickets = pd.DataFrame({
+        'number': ['123456', '123456', '56', '123456', '123456', '1'],
+        'province': ['TPHCM', 'Long An', 'Long An', 'Bình Phước', None, 'Bình Phước'],
+    })
+    result = check_tickets(mn_lookups, tickets)
+    assert result['best_prize'].tolist()[:3] == ['special', 'prize8', 'prize8']
+    assert result['error'].tolist() == [np.nan, np.nan, np.nan, 'province_not_drawn', 'province_not_drawn', 'invalid_number']
+    assert result['best_prize'].tolist()[3:] == [np.nan] * 3
+
+
+def test_province_argument(mn_lookups):
+    tickets = pd.DataFrame({'number': ['123456', '56']})
+    # 56 is also the end of the TPHCM special prize
+    assert check_tickets(mn_lookups, tickets, province='TPHCM')['best_prize'].tolist() == ['special', 'special']
+    assert check_tickets(mn_lookups, tickets, province='Long An')['best_prize'].tolist() == ['prize8', 'prize8']
+    assert check_tickets(mn_lookups, tickets, province='Cà Mau')['error'].tolist() == ['province_not_drawn'] * 2
+    with pytest.raises(ValueError):
+        check_tickets(mn_lookups, tickets)
+
+
+def test_integer_parquet_numbers_are_zero_padded(tmp_path, mb_lookups):
+    path = str(tmp_path / 'tickets.parquet')
+    pd.DataFrame({'number': pd.array([12345, 45, 2345, None], dtype='Int64')}).to_parquet(path, index=False)
+
+    numbers = pd.concat(iter_ticket_chunks(path, chunk_size=2, ticket_digits=5))['number']
+    assert numbers.tolist()[:3] == ['12345', '00045', '02345']
+    assert pd.isna(numbers.iloc[3])
+
+    result = pd.concat(check_ticket_file(path, mb_lookups, chunk_size=2, ticket_digits=5), ignore_index=True)
+    # Padded to 5 digits, 45 and 2345 no longer match the end of the special prize
+    assert [tier_counts(result, row) for row in range(3)] == [
+        {'special': 1, 'prize4': 1, 'prize7': 2},
+        {'prize7': 2},
+        {'prize4': 1, 'prize7': 2},
+    ]
+    assert result['error'].tolist() == [np.nan, np.nan, np.nan, 'invalid_number']
+
+
+def test_string_numbers_keep_leading_zeros(tmp_path):
+    parquet_path = str(tmp_path / 'tickets.parquet')
+    csv_path = str(tmp_path / 'tickets.csv')
+    tickets = pd.DataFrame({'number': ['045', '45', '00045']})
+    tickets.to_parquet(parquet_path, index=False)
+    tickets.to_csv(csv_path, index=False)
+
+    for path in (parquet_path, csv_path):
+        assert pd.concat(iter_ticket_chunks(path))['number'].tolist() == ['045', '45', '00045']